@@ -78,9 +78,9 @@ def main():
     report = analyzer.format_report(assessment, portfolio)
     print(report)
 
-    # Display concentration analysis
-    conc_report = conc_analyzer.format_report(conc_analysis)
-    print(conc_report)
+    # Display concentration analysis; formatting is deferred to __str__
+    # so it only runs here
+    print(conc_analysis)
 
     # Create alerts
     notifier = AlertNotifier()
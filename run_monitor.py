@@ -39,6 +39,15 @@ def is_market_hours() -> bool:
     return market_open <= now <= market_close
 
 
+def sleep_until(deadline: float) -> None:
+    """Sleep until a time.monotonic() deadline, in short chunks so Ctrl+C stays responsive."""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 1.0))
+
+
 def run_single_check(portfolio, analyzer, notifier, verbose=False):
     """Run a single portfolio check."""
     print(f"\n{'='*70}")
@@ -53,8 +62,7 @@ def run_single_check(portfolio, analyzer, notifier, verbose=False):
         create_alerts_from_assessment(assessment, notifier)
 
         # Get alert counts
-        critical = len([a for a in notifier._alerts if a.level == AlertLevel.CRITICAL])
-        warning = len([a for a in notifier._alerts if a.level == AlertLevel.WARNING])
+        counts = notifier.counts()
 
         # Summary
         print(f"\nOverall Risk: {assessment.overall_risk}")
@@ -62,12 +70,12 @@ def run_single_check(portfolio, analyzer, notifier, verbose=False):
         print(f"{notifier.format_summary()}")
 
         # Show critical/warning alerts
-        if critical > 0 or warning > 0:
+        if counts.critical > 0 or counts.warning > 0:
             print("\n" + "-"*50)
             notifier.notify_console(min_level=AlertLevel.WARNING)
 
             # Save critical alerts
-            if critical > 0:
+            if counts.critical > 0:
                 filepath = notifier.save_alerts()
                 print(f"\nAlerts saved to: {filepath}")
 
@@ -107,8 +115,10 @@ def main():
     print(f"Model: {args.model}")
 
     # Load portfolio
+    portfolio_path = Path(args.portfolio)
     try:
         portfolio = load_portfolio(args.portfolio)
+        portfolio_mtime = portfolio_path.stat().st_mtime_ns
         print(f"Portfolio: {portfolio.name}")
         print(f"Holdings: {', '.join(portfolio.get_tickers())}")
     except FileNotFoundError:
@@ -136,13 +146,31 @@ def main():
                 time.sleep(60 * 5)  # Check every 5 minutes if market is open
                 continue
 
+            # Fix the next deadline before the check runs so the cadence
+            # doesn't drift by however long the analysis takes
+            deadline = time.monotonic() + 60 * args.interval
+
+            # Reload the portfolio only if the file changed on disk
+            try:
+                mtime = portfolio_path.stat().st_mtime_ns
+                if mtime != portfolio_mtime:
+                    portfolio = load_portfolio(args.portfolio)
+                    portfolio_mtime = mtime
+                    print(f"Portfolio file changed - reloaded {portfolio.name}")
+            except FileNotFoundError:
+                pass  # Keep monitoring with the last good portfolio
+            except (ValueError, KeyError) as e:
+                # File caught mid-write or malformed (saves are rarely
+                # atomic); keep the last good portfolio and retry on the
+                # next cycle since the stale mtime triggers another reload
+                print(f"Portfolio file unreadable ({e}) - keeping previous portfolio")
+
             # Run check
             run_single_check(portfolio, analyzer, notifier, args.verbose)
 
-            # Wait for next interval
-            next_check = datetime.now().strftime('%H:%M')
-            print(f"\nNext check in {args.interval} minutes...")
-            time.sleep(60 * args.interval)
+            # Wait for the next deadline
+            print(f"\nNext check in {max(0.0, (deadline - time.monotonic()) / 60):.0f} minutes...")
+            sleep_until(deadline)
 
     except KeyboardInterrupt:
         print("\n\nMonitoring stopped by user.")
@@ -4,22 +4,48 @@ Handles alert delivery through various channels.
 """
 import os
 import json
+from collections import Counter, defaultdict, namedtuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Optional
-from enum import Enum
+from typing import Dict, List, Optional
+from enum import IntEnum
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-class AlertLevel(Enum):
-    """Alert severity levels."""
-    INFO = "info"           # FYI, no action needed
-    WATCH = "watch"         # Monitor closely
-    WARNING = "warning"     # Consider action
-    CRITICAL = "critical"   # Immediate attention required
 
+class AlertLevel(IntEnum):
+    """Alert severity levels, ordered so comparisons are integer compares."""
+    INFO = 0        # FYI, no action needed
+    WATCH = 1       # Monitor closely
+    WARNING = 2     # Consider action
+    CRITICAL = 3    # Immediate attention required
 
-@dataclass
+    @property
+    def label(self) -> str:
+        """Lowercase name used in serialized alerts ("info", "watch", ...)."""
+        return self.name.lower()
+
+
+# Alert levels in ascending severity (index == integer value);
+# get_alerts chains buckets from here
+_LEVEL_SEVERITY = tuple(AlertLevel)
+_LEVEL_BY_LABEL = {level.label: level for level in AlertLevel}
+
+# Per-level alert counts in one readable snapshot
+AlertCounts = namedtuple("AlertCounts", "critical warning watch info")
+
+# Console formatting constants, indexed by the integer alert level
+_LEVEL_ICONS = ("[i]", "[~]", "[!]", "[!!!]")
+_ALERT_HEADER = "\n" + "=" * 60 + "\nALERTS\n" + "=" * 60
+_ALERT_FOOTER = "\n" + "=" * 60
+
+
+@dataclass(slots=True)
 class Alert:
     """An alert to be delivered."""
     level: AlertLevel
@@ -32,7 +58,7 @@ class Alert:
 
     def to_dict(self) -> dict:
         return {
-            "level": self.level.value,
+            "level": self.level.label,
             "affected_holdings": self.affected_holdings,
             "title": self.title,
             "summary": self.summary,
@@ -48,11 +74,18 @@ class AlertNotifier:
     def __init__(self, alerts_dir: str = "data/alerts"):
         self.alerts_dir = Path(alerts_dir)
         self.alerts_dir.mkdir(parents=True, exist_ok=True)
-        self._alerts: List[Alert] = []
+        self._by_level: Dict[AlertLevel, List[Alert]] = defaultdict(list)
+        self._level_counts: Counter = Counter()
+
+    @property
+    def _alerts(self) -> List[Alert]:
+        """All queued alerts, grouped by ascending severity."""
+        return [a for level in _LEVEL_SEVERITY for a in self._by_level[level]]
 
     def add_alert(self, alert: Alert) -> None:
         """Add an alert to the queue."""
-        self._alerts.append(alert)
+        self._by_level[alert.level].append(alert)
+        self._level_counts[alert.level] += 1
 
     def add_from_risk(
         self,
@@ -60,7 +93,8 @@ class AlertNotifier:
         affected_holdings: List[str],
         severity: str,
         description: str,
-        recommended_action: str
+        recommended_action: str,
+        timestamp: Optional[datetime] = None
     ) -> None:
         """Create and add an alert from risk data."""
         level_map = {
@@ -70,13 +104,17 @@ class AlertNotifier:
             "LOW": AlertLevel.INFO
         }
 
+        # Short descriptions (the common case) pass through without any
+        # slicing or concatenation
+        summary = description if len(description) <= 200 else description[:200] + "..."
+
         alert = Alert(
             level=level_map.get(severity, AlertLevel.INFO),
             affected_holdings=affected_holdings,
             title=title,
-            summary=description[:200] + "..." if len(description) > 200 else description,
+            summary=summary,
             recommended_action=recommended_action,
-            timestamp=datetime.now(),
+            timestamp=timestamp if timestamp is not None else datetime.now(),
             details=description
         )
 
@@ -84,19 +122,15 @@ class AlertNotifier:
 
     def get_alerts(self, min_level: AlertLevel = AlertLevel.INFO) -> List[Alert]:
         """Get alerts at or above a minimum level."""
-        level_order = {
-            AlertLevel.INFO: 0,
-            AlertLevel.WATCH: 1,
-            AlertLevel.WARNING: 2,
-            AlertLevel.CRITICAL: 3
-        }
-
-        min_order = level_order[min_level]
-        return [a for a in self._alerts if level_order[a.level] >= min_order]
+        return [
+            a for level in _LEVEL_SEVERITY[min_level:]
+            for a in self._by_level[level]
+        ]
 
     def clear_alerts(self) -> None:
         """Clear all pending alerts."""
-        self._alerts = []
+        self._by_level = defaultdict(list)
+        self._level_counts = Counter()
 
     def notify_console(self, min_level: AlertLevel = AlertLevel.INFO) -> None:
         """Print alerts to console."""
@@ -106,61 +140,61 @@ class AlertNotifier:
             print("\n[OK] No alerts to report.")
             return
 
-        level_icons = {
-            AlertLevel.INFO: "[i]",
-            AlertLevel.WATCH: "[~]",
-            AlertLevel.WARNING: "[!]",
-            AlertLevel.CRITICAL: "[!!!]"
-        }
-
-        level_colors = {
-            AlertLevel.INFO: "",
-            AlertLevel.WATCH: "",
-            AlertLevel.WARNING: "",
-            AlertLevel.CRITICAL: ""
-        }
-
-        print("\n" + "=" * 60)
-        print("ALERTS")
-        print("=" * 60)
+        print(_ALERT_HEADER)
 
         for alert in alerts:
-            icon = level_icons[alert.level]
-            print(f"\n{icon} {alert.level.value.upper()}: {alert.title}")
+            icon = _LEVEL_ICONS[alert.level]
+            print(f"\n{icon} {alert.level.name}: {alert.title}")
             print(f"    Holdings: {', '.join(alert.affected_holdings)}")
             print(f"    {alert.summary}")
             print(f"    Action: {alert.recommended_action}")
 
-        print("\n" + "=" * 60)
+        print(_ALERT_FOOTER)
 
     def save_alerts(self, filename: Optional[str] = None) -> str:
-        """Save alerts to JSON file."""
+        """Save alerts to JSON file, streaming one record at a time."""
+        now = datetime.now()
         if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"alerts_{timestamp}.json"
+            filename = f"alerts_{now.strftime('%Y%m%d_%H%M%S')}.json"
 
         filepath = self.alerts_dir / filename
 
-        data = {
-            "generated": datetime.now().isoformat(),
-            "alert_count": len(self._alerts),
-            "alerts": [a.to_dict() for a in self._alerts]
-        }
-
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Stream records individually so peak memory during a save stays
+        # at one alert dict instead of the whole queue
+        if ORJSON_AVAILABLE:
+            dumps = orjson.dumps
+        else:
+            dumps = lambda obj: json.dumps(obj).encode()
+
+        with open(filepath, 'wb') as f:
+            f.write(
+                b'{"generated": ' + dumps(now.isoformat())
+                + b', "alert_count": ' + str(sum(self._level_counts.values())).encode()
+                + b', "alerts": ['
+            )
+            first = True
+            for level in _LEVEL_SEVERITY:
+                for alert in self._by_level[level]:
+                    if not first:
+                        f.write(b', ')
+                    f.write(dumps(alert.to_dict()))
+                    first = False
+            f.write(b']}')
 
         return str(filepath)
 
     def load_alerts(self, filepath: str) -> List[Alert]:
         """Load alerts from JSON file."""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            data = orjson.loads(Path(filepath).read_bytes())
+        else:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
 
         alerts = []
         for a in data.get('alerts', []):
             alerts.append(Alert(
-                level=AlertLevel(a['level']),
+                level=_LEVEL_BY_LABEL[a['level']],
                 affected_holdings=a['affected_holdings'],
                 title=a['title'],
                 summary=a['summary'],
@@ -171,14 +205,23 @@ class AlertNotifier:
 
         return alerts
 
+    def counts(self) -> AlertCounts:
+        """Get per-level alert counts in a single snapshot."""
+        c = self._level_counts
+        return AlertCounts(
+            critical=c[AlertLevel.CRITICAL],
+            warning=c[AlertLevel.WARNING],
+            watch=c[AlertLevel.WATCH],
+            info=c[AlertLevel.INFO]
+        )
+
     def format_summary(self) -> str:
         """Format a summary of current alerts."""
-        critical = len([a for a in self._alerts if a.level == AlertLevel.CRITICAL])
-        warning = len([a for a in self._alerts if a.level == AlertLevel.WARNING])
-        watch = len([a for a in self._alerts if a.level == AlertLevel.WATCH])
-        info = len([a for a in self._alerts if a.level == AlertLevel.INFO])
-
-        return f"Alerts: {critical} CRITICAL | {warning} WARNING | {watch} WATCH | {info} INFO"
+        c = self.counts()
+        return (
+            f"Alerts: {c.critical} CRITICAL | {c.warning} WARNING | "
+            f"{c.watch} WATCH | {c.info} INFO"
+        )
 
 
 def create_alerts_from_assessment(assessment, notifier: AlertNotifier) -> None:
@@ -189,11 +232,15 @@ def create_alerts_from_assessment(assessment, notifier: AlertNotifier) -> None:
         assessment: RiskAssessment from risk analyzer
         notifier: AlertNotifier to add alerts to
     """
+    # One timestamp for the whole assessment instead of per-alert
+    # datetime.now() calls
+    timestamp = datetime.now()
     for risk in assessment.risks:
         notifier.add_from_risk(
             title=risk.title,
             affected_holdings=risk.affected_holdings,
             severity=risk.severity.value,
             description=risk.description,
-            recommended_action=risk.recommended_action.value
+            recommended_action=risk.recommended_action.value,
+            timestamp=timestamp
         )
@@ -2,12 +2,81 @@
 Sector Concentration Analyzer for Port-Tracker.
 Analyzes portfolio diversification and flags concentration risks.
 """
+import io
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from src.portfolio.holdings import Portfolio, Holding
 
+# Concentration thresholds as bin edges for np.digitize; bins map
+# directly onto the labels below (mirrors ConcentrationAnalyzer.THRESHOLDS)
+_THRESHOLD_EDGES = np.array([20.0, 35.0, 50.0])
+_RISK_LABELS = np.array(["LOW", "MEDIUM", "HIGH", "CRITICAL"])
+
+# Report formatting constants, hoisted so they are built once
+_RULE = "-" * 70
+_SUBRULE = "-" * 50
+_RISK_ICONS = {
+    "LOW": "[OK]",
+    "MEDIUM": "[~]",
+    "HIGH": "[!]",
+    "CRITICAL": "[!!]"
+}
+
+
+def _fused_concentration(qty, px, sector_ids, n_sectors):
+    """
+    Fused single-pass concentration kernel: holding values, sector
+    totals, weights, HHI and risk bins in two tight loops with no
+    intermediate arrays. JIT-compiled when numba is installed.
+    """
+    totals = np.zeros(n_sectors)
+    total_value = 0.0
+    for i in range(qty.shape[0]):
+        q = qty[i]
+        p = px[i]
+        if not (np.isnan(q) or np.isnan(p)):
+            v = q * p
+            totals[sector_ids[i]] += v
+            total_value += v
+
+    weights = np.zeros(n_sectors)
+    bins = np.zeros(n_sectors, dtype=np.int64)
+    hhi = 0.0
+    if total_value > 0:
+        for s in range(n_sectors):
+            w = totals[s] / total_value
+            hhi += w * w
+            wp = w * 100.0
+            weights[s] = wp
+            if wp < 20.0:
+                bins[s] = 0
+            elif wp < 35.0:
+                bins[s] = 1
+            elif wp < 50.0:
+                bins[s] = 2
+            else:
+                bins[s] = 3
+
+    return totals, total_value, weights, hhi, bins
+
+
+if NUMBA_AVAILABLE:
+    _fused_concentration = njit(cache=True)(_fused_concentration)
 
-@dataclass
+# Below this holding count the NumPy path wins - no JIT warmup cost
+_FUSED_KERNEL_MIN_HOLDINGS = 200
+
+
+@dataclass(slots=True)
 class SectorConcentration:
     """Concentration data for a single sector."""
     sector: str
@@ -17,7 +86,7 @@ class SectorConcentration:
     risk_level: str  # LOW/MEDIUM/HIGH/CRITICAL based on thresholds
 
 
-@dataclass
+@dataclass(slots=True)
 class ConcentrationAnalysis:
     """Complete concentration analysis results."""
     total_value: float
@@ -25,6 +94,49 @@ class ConcentrationAnalysis:
     concentration_risks: List[str]  # warning messages
     herfindahl_index: float  # diversification metric (0-1, lower=more diverse)
 
+    def __str__(self) -> str:
+        """Lazily format the analysis as a readable report."""
+        buf = io.StringIO()
+        write = buf.write
+
+        write(f"{_RULE}\nSECTOR CONCENTRATION ANALYSIS\n{_RULE}\n")
+        write(f"Total Portfolio Value (Cost Basis): ${self.total_value:,.2f}\n")
+
+        # HHI interpretation
+        if self.herfindahl_index < 0.15:
+            hhi_desc = "(Highly Diversified)"
+        elif self.herfindahl_index < 0.25:
+            hhi_desc = "(Moderately Diversified)"
+        else:
+            hhi_desc = "(Concentrated)"
+        write(f"Herfindahl Index: {self.herfindahl_index:.3f} {hhi_desc}\n")
+
+        write(f"\nSector Breakdown:\n{_SUBRULE}\n")
+
+        # Display sectors sorted by weight
+        for sector in self.sector_breakdown:
+            risk_icon = _RISK_ICONS.get(sector.risk_level, "[?]")
+
+            # Create bar chart (scale: 2% per char)
+            bar = "#" * int(sector.weight_pct / 2)
+
+            write(
+                f"  {risk_icon} {sector.sector:<22} "
+                f"{sector.weight_pct:>5.1f}% "
+                f"${sector.value:>12,.2f}  {bar}\n"
+            )
+            write(f"       Holdings: {', '.join(sector.holdings)}\n")
+
+        # Concentration warnings
+        if self.concentration_risks:
+            write(f"\nConcentration Warnings:\n{_SUBRULE}\n")
+            for warning in self.concentration_risks:
+                write(f"  - {warning}\n")
+
+        write(_RULE)
+
+        return buf.getvalue()
+
 
 class ConcentrationAnalyzer:
     """Analyzes portfolio sector concentration and diversification."""
@@ -38,21 +150,55 @@ class ConcentrationAnalyzer:
     }
 
     def __init__(self):
-        pass
+        self._cache: Dict[int, ConcentrationAnalysis] = {}
 
     def analyze(self, portfolio: Portfolio) -> ConcentrationAnalysis:
         """
         Analyze portfolio concentration using cost basis valuation.
 
+        Concentration is a pure function of (ticker, sector, quantity,
+        avg_price), so results are memoized by a content hash of the SoA
+        arrays - repeated monitor ticks on an unchanged portfolio become
+        a dict lookup.
+
         Args:
             portfolio: Portfolio to analyze
 
         Returns:
             ConcentrationAnalysis with sector breakdown and risks
         """
-        # Calculate holding values and total
-        holding_values = self._calculate_holding_values(portfolio)
-        total_value = sum(holding_values.values())
+        key = hash((
+            tuple(portfolio._ticker_arr.tolist()),
+            tuple(portfolio._sector_arr.tolist()),
+            portfolio._qty_arr.tobytes(),
+            portfolio._px_arr.tobytes()
+        ))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        sectors, inverse = np.unique(portfolio._sector_arr, return_inverse=True)
+        n_sectors = len(sectors)
+
+        if NUMBA_AVAILABLE and len(portfolio.holdings) > _FUSED_KERNEL_MIN_HOLDINGS:
+            # Large portfolios: one fused compiled pass, no temporaries
+            totals, total_value, weights, hhi, bins = _fused_concentration(
+                portfolio._qty_arr, portfolio._px_arr,
+                inverse.astype(np.int64), n_sectors
+            )
+            total_value = float(total_value)
+            hhi = float(hhi)
+        else:
+            # Small portfolios: vectorized NumPy, skips JIT warmup
+            values = self._calculate_holding_values(portfolio)
+            total_value = float(values.sum())
+            totals = np.bincount(inverse, weights=values, minlength=n_sectors)
+            if total_value > 0:
+                weights = totals / total_value * 100.0
+            else:
+                weights = np.zeros(n_sectors)
+            bins = np.digitize(weights, _THRESHOLD_EDGES)
+            hhi = self._calculate_herfindahl_index(weights)
 
         if total_value == 0:
             return ConcentrationAnalysis(
@@ -62,73 +208,50 @@ class ConcentrationAnalyzer:
                 herfindahl_index=0
             )
 
-        # Group by sector
-        sector_weights = self._get_sector_weights(portfolio, holding_values, total_value)
+        sector_holdings = self._group_sector_tickers(portfolio, inverse, n_sectors)
 
-        # Build sector breakdown
+        # Build sector breakdown, sorted by weight descending
+        risk_levels = _RISK_LABELS[bins]
         sector_breakdown = []
-        for sector, data in sorted(sector_weights.items(), key=lambda x: x[1]["weight"], reverse=True):
-            risk_level = self._get_risk_level(data["weight"])
+        for i in np.argsort(-weights):
             sector_breakdown.append(SectorConcentration(
-                sector=sector,
-                holdings=data["holdings"],
-                weight_pct=data["weight"],
-                value=data["value"],
-                risk_level=risk_level
+                sector=sectors[i],
+                holdings=sector_holdings[i],
+                weight_pct=float(weights[i]),
+                value=float(totals[i]),
+                risk_level=str(risk_levels[i])
             ))
 
-        # Calculate Herfindahl Index
-        hhi = self._calculate_herfindahl_index(
-            {s: d["weight"] for s, d in sector_weights.items()}
-        )
-
         # Generate concentration warnings
         concentration_risks = self._generate_warnings(sector_breakdown, hhi)
 
-        return ConcentrationAnalysis(
+        analysis = ConcentrationAnalysis(
             total_value=total_value,
             sector_breakdown=sector_breakdown,
             concentration_risks=concentration_risks,
             herfindahl_index=hhi
         )
+        self._cache[key] = analysis
+        return analysis
 
-    def _calculate_holding_values(self, portfolio: Portfolio) -> Dict[str, float]:
-        """Calculate cost basis value for each holding."""
-        values = {}
-        for holding in portfolio.holdings:
-            if holding.quantity is not None and holding.avg_price is not None:
-                values[holding.ticker] = holding.quantity * holding.avg_price
-            else:
-                values[holding.ticker] = 0
-        return values
+    def _calculate_holding_values(self, portfolio: Portfolio) -> np.ndarray:
+        """Calculate cost basis value for each holding (aligned to the SoA arrays)."""
+        return np.nan_to_num(portfolio._qty_arr * portfolio._px_arr)
 
-    def _get_sector_weights(
+    def _group_sector_tickers(
         self,
         portfolio: Portfolio,
-        holding_values: Dict[str, float],
-        total_value: float
-    ) -> Dict[str, Dict]:
-        """Calculate sector weights from holding values."""
-        sector_data: Dict[str, Dict] = {}
-
-        for holding in portfolio.holdings:
-            sector = holding.sector
-            value = holding_values.get(holding.ticker, 0)
-
-            if sector not in sector_data:
-                sector_data[sector] = {"holdings": [], "value": 0, "weight": 0}
-
-            sector_data[sector]["holdings"].append(holding.ticker)
-            sector_data[sector]["value"] += value
-
-        # Calculate weights
-        for sector in sector_data:
-            sector_data[sector]["weight"] = (
-                sector_data[sector]["value"] / total_value * 100
-                if total_value > 0 else 0
-            )
-
-        return sector_data
+        inverse: np.ndarray,
+        n_sectors: int
+    ) -> List[List[str]]:
+        """
+        Build per-sector ticker lists via one stable argsort instead of
+        per-holding appends.
+        """
+        order = np.argsort(inverse, kind='stable')
+        counts = np.bincount(inverse, minlength=n_sectors)
+        splits = np.split(portfolio._ticker_arr[order], np.cumsum(counts)[:-1])
+        return [s.tolist() for s in splits]
 
     def _get_risk_level(self, weight_pct: float) -> str:
         """Determine risk level based on concentration weight."""
@@ -141,7 +264,7 @@ class ConcentrationAnalyzer:
         else:
             return "CRITICAL"
 
-    def _calculate_herfindahl_index(self, weights: Dict[str, float]) -> float:
+    def _calculate_herfindahl_index(self, weights: np.ndarray) -> float:
         """
         Calculate Herfindahl-Hirschman Index for diversification.
 
@@ -151,7 +274,8 @@ class ConcentrationAnalyzer:
         - 0.15-0.25: Moderately diversified
         - > 0.25: Concentrated
         """
-        return sum((w / 100) ** 2 for w in weights.values())
+        w = weights / 100.0
+        return float(w @ w)
 
     def _generate_warnings(
         self,
@@ -194,53 +318,4 @@ class ConcentrationAnalyzer:
 
     def format_report(self, analysis: ConcentrationAnalysis) -> str:
         """Format concentration analysis as a readable report."""
-        lines = []
-        lines.append("-" * 70)
-        lines.append("SECTOR CONCENTRATION ANALYSIS")
-        lines.append("-" * 70)
-        lines.append(f"Total Portfolio Value (Cost Basis): ${analysis.total_value:,.2f}")
-
-        # HHI interpretation
-        if analysis.herfindahl_index < 0.15:
-            hhi_desc = "(Highly Diversified)"
-        elif analysis.herfindahl_index < 0.25:
-            hhi_desc = "(Moderately Diversified)"
-        else:
-            hhi_desc = "(Concentrated)"
-        lines.append(f"Herfindahl Index: {analysis.herfindahl_index:.3f} {hhi_desc}")
-
-        lines.append("")
-        lines.append("Sector Breakdown:")
-        lines.append("-" * 50)
-
-        # Display sectors sorted by weight
-        for sector in analysis.sector_breakdown:
-            risk_icon = {
-                "LOW": "[OK]",
-                "MEDIUM": "[~]",
-                "HIGH": "[!]",
-                "CRITICAL": "[!!]"
-            }.get(sector.risk_level, "[?]")
-
-            # Create bar chart
-            bar_length = int(sector.weight_pct / 2)  # Scale: 2% per char
-            bar = "#" * bar_length
-
-            lines.append(
-                f"  {risk_icon} {sector.sector:<22} "
-                f"{sector.weight_pct:>5.1f}% "
-                f"${sector.value:>12,.2f}  {bar}"
-            )
-            lines.append(f"       Holdings: {', '.join(sector.holdings)}")
-
-        # Concentration warnings
-        if analysis.concentration_risks:
-            lines.append("")
-            lines.append("Concentration Warnings:")
-            lines.append("-" * 50)
-            for warning in analysis.concentration_risks:
-                lines.append(f"  - {warning}")
-
-        lines.append("-" * 70)
-
-        return "\n".join(lines)
+        return str(analysis)
@@ -2,13 +2,34 @@
 Pattern Detector for Port-Tracker.
 Detects historical patterns that often precede price moves.
 """
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from enum import Enum
 
+import numpy as np
 import yfinance as yf
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from src.utils.file_cache import FileCache
+
+# Cache TTLs: history goes stale within a trading session, while the
+# 52-week levels in .info barely move intraday
+_HISTORY_TTL_SECONDS = 15 * 60
+_INFO_TTL_SECONDS = 24 * 60 * 60
+
+# Detected patterns are stable for roughly one price bar
+_RESULT_TTL_SECONDS = 5 * 60
+
 
 class PatternType(Enum):
     """Types of detectable patterns."""
@@ -19,7 +40,7 @@ class PatternType(Enum):
     MOMENTUM = "momentum"            # Strong momentum that may exhaust
 
 
-@dataclass
+@dataclass(slots=True)
 class DetectedPattern:
     """A detected pattern that may indicate risk."""
     ticker: str
@@ -76,15 +97,69 @@ PATTERNS = {
 }
 
 
+# yf.download batches up to ~20 symbols into one Yahoo request
+_BULK_CHUNK_SIZE = 20
+
+# Report formatting constants, hoisted so they are built once
+_RISK_ICONS = {"HIGH": "[!!!]", "MEDIUM": "[!!]", "LOW": "[!]"}
+
+# Hot-path pattern definitions bound once at import, so detections skip
+# the repeated PATTERNS["..."] hashing per branch hit
+_CONSEC_UP_DEF = PATTERNS["consecutive_up_days"]
+_CONSEC_DOWN_DEF = PATTERNS["consecutive_down_days"]
+_52W_HIGH_DEF = PATTERNS["52_week_high"]
+_52W_LOW_DEF = PATTERNS["52_week_low"]
+_PARABOLIC_DEF = PATTERNS["parabolic_move"]
+_PARABOLIC_THRESHOLD_PCT = _PARABOLIC_DEF["threshold_pct"]
+
+
+def _trailing_streak(closes):
+    """
+    Length of the trailing run of up days and down days (one of the two
+    is always zero; equal closes count as down). JIT-compiled when numba
+    is installed, so it stays O(streak) even on long history windows.
+    """
+    up = 0
+    down = 0
+    for i in range(closes.shape[0] - 1, 0, -1):
+        if closes[i] > closes[i - 1]:
+            if down == 0:
+                up += 1
+            else:
+                break
+        else:
+            if up == 0:
+                down += 1
+            else:
+                break
+    return up, down
+
+
+if NUMBA_AVAILABLE:
+    _trailing_streak = njit(cache=True)(_trailing_streak)
+
+
 class PatternDetector:
     """Detects historical patterns in asset prices."""
 
     def __init__(self):
-        self._cache: Dict[str, dict] = {}
+        # ticker -> (timestamp, patterns); lock guards the threaded
+        # writes from detect_all
+        self._cache: Dict[str, tuple] = {}
+        self._cache_lock = threading.Lock()
+        self._file_cache = FileCache('.cache/yfinance')
+
+    def _cached_patterns(self, ticker: str) -> Optional[List[DetectedPattern]]:
+        """Get a memoized detection result if it is still fresh."""
+        with self._cache_lock:
+            entry = self._cache.get(ticker)
+        if entry is not None and time.time() - entry[0] < _RESULT_TTL_SECONDS:
+            return entry[1]
+        return None
 
     def detect_patterns(self, ticker: str) -> List[DetectedPattern]:
         """
-        Detect all patterns for a ticker.
+        Detect all patterns for a ticker (fetches its own history).
 
         Args:
             ticker: Ticker symbol
@@ -92,54 +167,139 @@ class PatternDetector:
         Returns:
             List of detected patterns
         """
-        patterns = []
-
-        # Get price history
-        try:
-            yf_ticker = yf.Ticker(ticker)
-            hist = yf_ticker.history(period='30d')
-            if len(hist) < 5:
+        cached = self._cached_patterns(ticker)
+        if cached is not None:
+            return cached
+
+        hist = self._file_cache.get((ticker, 'history', '30d'), _HISTORY_TTL_SECONDS)
+        if hist is None:
+            try:
+                hist = yf.Ticker(ticker).history(period='30d')
+            except Exception as e:
+                print(f"Error fetching {ticker}: {e}")
                 return []
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
+            self._file_cache.set((ticker, 'history', '30d'), hist)
+
+        return self.detect_patterns_from_hist(ticker, hist)
+
+    def _get_info(self, ticker: str) -> dict:
+        """Get the yfinance .info dict, cached on disk (it is the slowest call)."""
+        info = self._file_cache.get((ticker, 'info'), _INFO_TTL_SECONDS)
+        if info is None:
+            info = yf.Ticker(ticker).info
+            self._file_cache.set((ticker, 'info'), info)
+        return info
+
+    def detect_patterns_from_hist(self, ticker: str, hist) -> List[DetectedPattern]:
+        """
+        Detect all patterns for a ticker from a pre-fetched history DataFrame.
+
+        Args:
+            ticker: Ticker symbol
+            hist: 30d OHLCV DataFrame for the ticker
+
+        Returns:
+            List of detected patterns
+        """
+        cached = self._cached_patterns(ticker)
+        if cached is not None:
+            return cached
+
+        if hist is None or len(hist) < 5:
             return []
 
+        # Extract the closes array once; every check works off it, which
+        # avoids repeated column lookup and iloc dispatch in the helpers
+        closes = hist['Close'].to_numpy(dtype=np.float64)
+
+        patterns = []
+
         # Check consecutive up/down days
-        streak_pattern = self._check_streak(ticker, hist)
+        streak_pattern = self._check_streak(ticker, closes)
         if streak_pattern:
             patterns.append(streak_pattern)
 
-        # Check 52-week extremes
-        extreme_pattern = self._check_extremes(ticker, yf_ticker, hist)
-        if extreme_pattern:
-            patterns.append(extreme_pattern)
+        # Check 52-week extremes - but only pay the expensive .info fetch
+        # when the price is within the same 2% band of a 30-day extreme
+        # that _check_extremes uses, since the 52-week high/low is at
+        # least as far out as the 30-day one
+        if closes[-1] >= closes.max() * 0.98 or closes[-1] <= closes.min() * 1.02:
+            extreme_pattern = self._check_extremes(ticker, closes)
+            if extreme_pattern:
+                patterns.append(extreme_pattern)
 
         # Check for parabolic move
-        parabolic_pattern = self._check_parabolic(ticker, hist)
+        parabolic_pattern = self._check_parabolic(ticker, closes)
         if parabolic_pattern:
             patterns.append(parabolic_pattern)
 
+        with self._cache_lock:
+            self._cache[ticker] = (time.time(), patterns)
         return patterns
 
-    def _check_streak(self, ticker: str, hist) -> Optional[DetectedPattern]:
-        """Check for consecutive up/down day streaks."""
-        consecutive_up = 0
-        consecutive_down = 0
-
-        for i in range(len(hist) - 1, 0, -1):
-            if hist['Close'].iloc[i] > hist['Close'].iloc[i-1]:
-                if consecutive_down == 0:
-                    consecutive_up += 1
-                else:
-                    break
+    def _bulk_fetch(self, tickers: List[str]) -> Dict[str, Any]:
+        """
+        Fetch 30d history for many tickers in batched yf.download calls.
+
+        One request per chunk of tickers instead of one per ticker.
+
+        Returns:
+            Dict mapping ticker to its history DataFrame (missing on failure)
+        """
+        histories: Dict[str, Any] = {}
+        misses = []
+        for ticker in tickers:
+            hist = self._file_cache.get((ticker, 'history', '30d'), _HISTORY_TTL_SECONDS)
+            if hist is not None:
+                histories[ticker] = hist
             else:
-                if consecutive_up == 0:
-                    consecutive_down += 1
-                else:
-                    break
+                misses.append(ticker)
+
+        for start in range(0, len(misses), _BULK_CHUNK_SIZE):
+            chunk = misses[start:start + _BULK_CHUNK_SIZE]
+            try:
+                data = yf.download(
+                    ' '.join(chunk),
+                    period='30d',
+                    group_by='ticker',
+                    threads=True,
+                    progress=False
+                )
+            except Exception as e:
+                print(f"Error fetching {', '.join(chunk)}: {e}")
+                continue
+
+            for ticker in chunk:
+                try:
+                    hist = data[ticker].dropna(how='all')
+                except KeyError:
+                    # Older yfinance returns single-symbol downloads flat,
+                    # without the ticker column level; newer versions keep
+                    # it, so normalize by shape rather than chunk size
+                    if len(chunk) > 1:
+                        continue
+                    hist = data
+                histories[ticker] = hist
+                self._file_cache.set((ticker, 'history', '30d'), hist)
+
+        return histories
+
+    def _check_streak(self, ticker: str, closes: np.ndarray) -> Optional[DetectedPattern]:
+        """Check for consecutive up/down day streaks (caller guarantees >= 5 rows)."""
+        if NUMBA_AVAILABLE:
+            # Compiled early-exit loop: touches only the trailing streak
+            consecutive_up, consecutive_down = _trailing_streak(closes)
+        else:
+            # Vectorized trailing run length: reverse the day-over-day
+            # directions and find the first day that broke the streak
+            up = np.diff(closes) > 0
+            breaks = np.nonzero(up[::-1] != up[-1])[0]
+            run_len = int(breaks[0]) if breaks.size else up.size
+            consecutive_up = run_len if up[-1] else 0
+            consecutive_down = 0 if up[-1] else run_len
 
         if consecutive_up >= 7:
-            pattern_def = PATTERNS["consecutive_up_days"]
+            pattern_def = _CONSEC_UP_DEF
             return DetectedPattern(
                 ticker=ticker,
                 pattern_type=pattern_def["type"],
@@ -150,7 +310,7 @@ class PatternDetector:
             )
 
         if consecutive_down >= 5:
-            pattern_def = PATTERNS["consecutive_down_days"]
+            pattern_def = _CONSEC_DOWN_DEF
             return DetectedPattern(
                 ticker=ticker,
                 pattern_type=pattern_def["type"],
@@ -162,17 +322,17 @@ class PatternDetector:
 
         return None
 
-    def _check_extremes(self, ticker: str, yf_ticker, hist) -> Optional[DetectedPattern]:
+    def _check_extremes(self, ticker: str, closes: np.ndarray) -> Optional[DetectedPattern]:
         """Check if at 52-week high/low."""
         try:
-            info = yf_ticker.info
-            current_price = hist['Close'].iloc[-1]
+            info = self._get_info(ticker)
+            current_price = closes[-1]
             high_52w = info.get('fiftyTwoWeekHigh', current_price * 1.1)
             low_52w = info.get('fiftyTwoWeekLow', current_price * 0.9)
 
             # Within 2% of 52-week high
             if current_price >= high_52w * 0.98:
-                pattern_def = PATTERNS["52_week_high"]
+                pattern_def = _52W_HIGH_DEF
                 return DetectedPattern(
                     ticker=ticker,
                     pattern_type=pattern_def["type"],
@@ -184,7 +344,7 @@ class PatternDetector:
 
             # Within 2% of 52-week low
             if current_price <= low_52w * 1.02:
-                pattern_def = PATTERNS["52_week_low"]
+                pattern_def = _52W_LOW_DEF
                 return DetectedPattern(
                     ticker=ticker,
                     pattern_type=pattern_def["type"],
@@ -199,18 +359,15 @@ class PatternDetector:
 
         return None
 
-    def _check_parabolic(self, ticker: str, hist) -> Optional[DetectedPattern]:
-        """Check for parabolic (unsustainable) price move."""
-        if len(hist) < 5:
-            return None
-
-        current_price = hist['Close'].iloc[-1]
-        price_5d_ago = hist['Close'].iloc[-5]
+    def _check_parabolic(self, ticker: str, closes: np.ndarray) -> Optional[DetectedPattern]:
+        """Check for parabolic (unsustainable) price move (caller guarantees >= 5 rows)."""
+        current_price = closes[-1]
+        price_5d_ago = closes[-5]
 
         pct_change = ((current_price - price_5d_ago) / price_5d_ago) * 100
 
-        pattern_def = PATTERNS["parabolic_move"]
-        threshold = pattern_def["threshold_pct"]
+        pattern_def = _PARABOLIC_DEF
+        threshold = _PARABOLIC_THRESHOLD_PCT
 
         if pct_change >= threshold:
             return DetectedPattern(
@@ -244,11 +401,23 @@ class PatternDetector:
         Returns:
             Dict mapping ticker to list of patterns
         """
+        if not tickers:
+            return {}
+
+        histories = self._bulk_fetch(tickers)
+
+        # Per-ticker analysis is independent and may still block on network
+        # (.info in _check_extremes), so fan it out across threads
         results = {}
-        for ticker in tickers:
-            patterns = self.detect_patterns(ticker)
-            if patterns:
-                results[ticker] = patterns
+        with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+            futures = {
+                executor.submit(self.detect_patterns_from_hist, t, histories.get(t)): t
+                for t in tickers
+            }
+            for future in as_completed(futures):
+                patterns = future.result()
+                if patterns:
+                    results[futures[future]] = patterns
         return results
 
     def format_for_llm(self, patterns: Dict[str, List[DetectedPattern]]) -> str:
@@ -256,17 +425,16 @@ class PatternDetector:
         if not patterns:
             return "No significant technical patterns detected."
 
-        lines = []
-        lines.append("## Technical Pattern Analysis")
-        lines.append("")
+        buf = io.StringIO()
+        write = buf.write
+        write("## Technical Pattern Analysis\n\n")
 
         for ticker, ticker_patterns in patterns.items():
             for p in ticker_patterns:
-                risk_icon = {"HIGH": "[!!!]", "MEDIUM": "[!!]", "LOW": "[!]"}.get(p.risk_level, "[?]")
-                lines.append(f"### {risk_icon} {ticker}: {p.pattern_type.value.upper()}")
-                lines.append(f"    {p.description}")
-                lines.append(f"    Historical: {p.historical_outcome}")
-                lines.append(f"    Probability: {p.probability*100:.0f}%")
-                lines.append("")
-
-        return "\n".join(lines)
+                risk_icon = _RISK_ICONS.get(p.risk_level, "[?]")
+                write(f"### {risk_icon} {ticker}: {p.pattern_type.value.upper()}\n")
+                write(f"    {p.description}\n")
+                write(f"    Historical: {p.historical_outcome}\n")
+                write(f"    Probability: {p.probability*100:.0f}%\n\n")
+
+        return buf.getvalue()[:-1]
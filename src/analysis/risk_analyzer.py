@@ -2,12 +2,22 @@
 LLM-Powered Risk Analyzer for Port-Tracker.
 The core predictive analysis engine that identifies portfolio risks.
 """
+import asyncio
+import io
 import json
+import re
+from string import Template
 from datetime import datetime
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 from enum import Enum
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from src.llm.providers import get_llm
 from src.portfolio.holdings import Portfolio
 from src.monitors.news_scanner import NewsScanner, NewsItem
@@ -40,7 +50,7 @@ class RecommendedAction(Enum):
     EXIT = "EXIT"
 
 
-@dataclass
+@dataclass(slots=True)
 class Risk:
     """An identified portfolio risk."""
     risk_id: str
@@ -71,7 +81,7 @@ class Risk:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskAssessment:
     """Complete risk assessment for a portfolio."""
     timestamp: datetime
@@ -92,20 +102,62 @@ class RiskAssessment:
         }
 
 
+# Value -> member maps so response parsing skips Enum.__call__ and its
+# defensive error path on every risk
+_RISK_TYPE_MAP = {m.value: m for m in RiskType}
+_SEVERITY_MAP = {m.value: m for m in RiskSeverity}
+_ACTION_MAP = {m.value: m for m in RecommendedAction}
+
+# Report formatting constants, hoisted so they are built once
+_DOUBLE_RULE = "=" * 70
+_RULE = "-" * 70
+_OVERALL_RISK_ICONS = {
+    "LOW": "[OK]",
+    "MODERATE": "[~]",
+    "ELEVATED": "[!]",
+    "HIGH": "[!!]"
+}
+
+# Finds the first ```/```json fenced block; unanchored because models
+# sometimes wrap the fence in prose ("Hope this helps!")
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
+def _strip_fence(content: str) -> str:
+    """Pull the payload out of a markdown fence, tolerating sloppy fencing."""
+    fenced = _FENCE_RE.search(content)
+    if fenced:
+        return fenced.group(1)
+    if content.startswith('```'):
+        # Opening fence with no closing backticks
+        content = content[3:]
+        if content.startswith('json'):
+            content = content[4:]
+        return content.strip()
+    return content
+
+
+def _loads(content: str) -> Any:
+    """Parse a JSON string with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 RISK_ANALYSIS_PROMPT = """You are a PREDICTIVE RISK ANALYST monitoring a portfolio for early warning signs.
 Your job is to identify POTENTIAL RISKS BEFORE they impact prices - not react to drops that already happened.
 
 ## YOUR PORTFOLIO
-{portfolio_summary}
+$portfolio_summary
 
 ## CURRENT NEWS & EVENTS
-{news_summary}
+$news_summary
 
 ## UPCOMING SCHEDULED EVENTS
-{calendar_summary}
+$calendar_summary
 
 ## CORRELATED ASSET ANALYSIS
-{correlation_summary}
+$correlation_summary
 
 ## YOUR TASK
 Analyze the current market environment and identify POTENTIAL RISKS to the portfolio.
@@ -129,12 +181,12 @@ For each risk identified, provide:
 7. **Recommended Action**: WATCH / HEDGE / REDUCE / EXIT
 
 Output VALID JSON only (no markdown code blocks):
-{{
-  "analysis_timestamp": "{timestamp}",
+{
+  "analysis_timestamp": "$timestamp",
   "market_regime": "RISK_ON or RISK_OFF or UNCERTAIN",
   "overall_portfolio_risk": "LOW or MODERATE or ELEVATED or HIGH",
   "risks": [
-    {{
+    {
       "risk_id": "risk_001",
       "affected_holdings": ["SLV", "GLD"],
       "risk_type": "MACRO",
@@ -146,16 +198,44 @@ Output VALID JSON only (no markdown code blocks):
       "leading_indicators": ["Indicator 1", "Indicator 2"],
       "recommended_action": "REDUCE",
       "confidence": "MEDIUM"
-    }}
+    }
   ],
   "safe_holdings": ["QQQ"],
   "summary": "One sentence overall assessment"
-}}
+}
 
 IMPORTANT: If no significant risks are found, return an empty risks array.
 Do not manufacture risks - only report genuine concerns based on the data provided.
 """
 
+# Parsed once at import; substitute() skips str.format's template re-scan
+# and the brace-escaping a literal JSON example would otherwise need
+_PROMPT_TEMPLATE = Template(RISK_ANALYSIS_PROMPT)
+
+
+TRIAGE_PROMPT = """You are a fast risk triage filter for a portfolio monitor.
+Given the news, scheduled events and correlation data below, decide which risk categories currently have ANY live signal.
+
+## CURRENT NEWS
+$news_summary
+
+## UPCOMING SCHEDULED EVENTS
+$calendar_summary
+
+## CORRELATED ASSET ANALYSIS
+$correlation_summary
+
+Reply with a VALID JSON array only (no markdown), containing just the categories with signals,
+chosen from: ["MACRO", "SECTOR", "COMPANY", "TECHNICAL", "CORRELATION"].
+"""
+
+_TRIAGE_TEMPLATE = Template(TRIAGE_PROMPT)
+_RISK_CATEGORIES = ("MACRO", "SECTOR", "COMPANY", "TECHNICAL", "CORRELATION")
+
+# Calendar events span macro data, earnings and sector-wide moves, so
+# the calendar section stays unless every one of these is quiet
+_CALENDAR_CATEGORIES = frozenset({"MACRO", "SECTOR", "COMPANY"})
+
 
 class RiskAnalyzer:
     """LLM-powered risk analysis engine."""
@@ -177,35 +257,41 @@ class RiskAnalyzer:
         Returns:
             Complete risk assessment
         """
-        # Gather data from all monitors
-        print("  Scanning news...")
-        portfolio_news = self.news_scanner.scan_portfolio_news(portfolio)
-        macro_news = self.news_scanner.scan_macro_events()
-        all_news = portfolio_news + macro_news
+        # Gather data from all monitors concurrently - each step is
+        # independent network I/O, so wall time is the slowest call
+        # instead of the sum of all five
+        print("  Gathering news, calendar and correlation data...")
+        all_tickers = list(portfolio.get_all_watch_tickers())
+        portfolio_news, macro_news, events, correlation_summary, plex_result = asyncio.run(
+            self._gather_monitor_data(portfolio, all_tickers, use_perplexity)
+        )
 
-        # Enhanced search with Perplexity
+        all_news = portfolio_news + macro_news
         perplexity_intel = ""
-        if use_perplexity:
-            print("  Getting real-time intelligence (Perplexity)...")
-            plex_result = self.news_scanner.scan_with_perplexity(portfolio)
-            if plex_result:
-                perplexity_intel = f"\n\n## REAL-TIME MARKET INTELLIGENCE\n{plex_result}"
+        if plex_result:
+            perplexity_intel = f"\n\n## REAL-TIME MARKET INTELLIGENCE\n{plex_result}"
 
-        print("  Checking economic calendar...")
-        events = self.event_calendar.get_upcoming_events(days_ahead=7)
         events = self.event_calendar.match_events_to_holdings(events, portfolio)
 
-        print("  Analyzing correlations...")
-        all_tickers = list(portfolio.get_all_watch_tickers())
-        correlation_summary = self.correlation_tracker.format_for_llm(all_tickers)
-
         # Format for LLM
         portfolio_summary = portfolio.format_for_llm()
         news_summary = self.news_scanner.format_news_for_llm(all_news) + perplexity_intel
         calendar_summary = self.event_calendar.format_events_for_llm(events)
 
+        # Cheap triage pass on a small model: drop prompt sections whose
+        # risk categories show no signal, so the expensive model reads a
+        # much shorter prompt in the common quiet-market case. The triage
+        # sees every section it may gate.
+        categories = self._triage_categories(
+            news_summary, calendar_summary, correlation_summary
+        )
+        if "CORRELATION" not in categories:
+            correlation_summary = "No correlation divergences flagged in triage."
+        if not _CALENDAR_CATEGORIES.intersection(categories):
+            calendar_summary = "No market-moving scheduled events flagged in triage."
+
         # Build prompt
-        prompt = RISK_ANALYSIS_PROMPT.format(
+        prompt = _PROMPT_TEMPLATE.substitute(
             portfolio_summary=portfolio_summary,
             news_summary=news_summary,
             calendar_summary=calendar_summary,
@@ -213,14 +299,87 @@ class RiskAnalyzer:
             timestamp=datetime.now().isoformat()
         )
 
-        # Call LLM
+        # Call LLM, streaming the completion so tokens accumulate as they
+        # arrive instead of blocking on the full multi-second generation
         print(f"  Analyzing with {self.model}...")
         llm = get_llm(self.model, temperature=0.3, max_tokens=3000)
-        response = llm.invoke(prompt)
+        try:
+            pieces = []
+            for chunk in llm.stream(prompt):
+                piece = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if piece:
+                    pieces.append(piece)
+            response = "".join(pieces)
+        except (AttributeError, NotImplementedError):
+            # Model has no streaming support - fall back to blocking invoke
+            response = llm.invoke(prompt)
 
         # Parse response
         return self._parse_response(response)
 
+    def _triage_categories(
+        self,
+        news_summary: str,
+        calendar_summary: str,
+        correlation_summary: str
+    ) -> List[str]:
+        """
+        First-pass classification of which risk categories have signals.
+
+        Runs a small, cheap model over the news, calendar and correlation
+        text. Any failure (bad JSON, model error) falls back to all
+        categories so the main analysis never loses input to a broken
+        triage.
+        """
+        try:
+            llm = get_llm("gpt-4o", temperature=0.0, max_tokens=50)
+            response = llm.invoke(_TRIAGE_TEMPLATE.substitute(
+                news_summary=news_summary,
+                calendar_summary=calendar_summary,
+                correlation_summary=correlation_summary
+            ))
+            content = response.content if hasattr(response, 'content') else str(response)
+            content = content.strip()
+            content = _strip_fence(content)
+            categories = [c for c in _loads(content) if c in _RISK_CATEGORIES]
+            if categories:
+                return categories
+        except Exception as e:
+            print(f"  Warning: triage pass failed ({e}); analyzing all categories")
+        return list(_RISK_CATEGORIES)
+
+    async def _gather_monitor_data(
+        self,
+        portfolio: Portfolio,
+        all_tickers: List[str],
+        use_perplexity: bool
+    ) -> tuple:
+        """
+        Run the monitor fetches concurrently on worker threads.
+
+        The monitors expose sync APIs, so each call is wrapped in
+        asyncio.to_thread and awaited with gather.
+
+        Returns:
+            (portfolio_news, macro_news, events, correlation_summary,
+            perplexity_result) - the last is None when Perplexity is off.
+        """
+        tasks = [
+            asyncio.to_thread(self.news_scanner.scan_portfolio_news, portfolio),
+            asyncio.to_thread(self.news_scanner.scan_macro_events),
+            asyncio.to_thread(self.event_calendar.get_upcoming_events, days_ahead=7),
+            asyncio.to_thread(self.correlation_tracker.format_for_llm, all_tickers),
+        ]
+        if use_perplexity:
+            tasks.append(
+                asyncio.to_thread(self.news_scanner.scan_with_perplexity, portfolio)
+            )
+
+        results = await asyncio.gather(*tasks)
+        if not use_perplexity:
+            results = (*results, None)
+        return results
+
     def _parse_response(self, response) -> RiskAssessment:
         """Parse LLM response into RiskAssessment."""
         try:
@@ -228,12 +387,9 @@ class RiskAnalyzer:
             content = content.strip()
 
             # Clean up markdown if present
-            if content.startswith('```'):
-                content = content.split('```')[1]
-                if content.startswith('json'):
-                    content = content[4:]
+            content = _strip_fence(content)
 
-            result = json.loads(content)
+            result = _loads(content)
 
             # Parse risks
             risks = []
@@ -242,14 +398,17 @@ class RiskAnalyzer:
                     risks.append(Risk(
                         risk_id=r.get('risk_id', f"risk_{len(risks)+1}"),
                         affected_holdings=r.get('affected_holdings', []),
-                        risk_type=RiskType(r.get('risk_type', 'MACRO')),
-                        severity=RiskSeverity(r.get('severity', 'MEDIUM')),
+                        # Defaults apply to missing keys only; an invalid
+                        # value raises KeyError into the skip path below,
+                        # matching the baseline Enum() behaviour
+                        risk_type=_RISK_TYPE_MAP[r.get('risk_type', 'MACRO')],
+                        severity=_SEVERITY_MAP[r.get('severity', 'MEDIUM')],
                         time_horizon=r.get('time_horizon', 'SHORT'),
                         title=r.get('title', 'Unknown Risk'),
                         description=r.get('description', ''),
                         historical_pattern=r.get('historical_pattern', ''),
                         leading_indicators=r.get('leading_indicators', []),
-                        recommended_action=RecommendedAction(r.get('recommended_action', 'WATCH')),
+                        recommended_action=_ACTION_MAP[r.get('recommended_action', 'WATCH')],
                         confidence=r.get('confidence', 'MEDIUM')
                     ))
                 except Exception as e:
@@ -264,7 +423,7 @@ class RiskAnalyzer:
                 summary=result.get('summary', 'Analysis complete.')
             )
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:  # covers both json and orjson decode errors
             print(f"  Warning: Could not parse LLM response: {e}")
             return RiskAssessment(
                 timestamp=datetime.now(),
@@ -277,80 +436,63 @@ class RiskAnalyzer:
 
     def format_report(self, assessment: RiskAssessment, portfolio: Portfolio) -> str:
         """Format risk assessment as a readable report."""
-        lines = []
-        lines.append("=" * 70)
-        lines.append("PORT-TRACKER RISK ANALYSIS")
-        lines.append(f"Timestamp: {assessment.timestamp.strftime('%Y-%m-%d %H:%M:%S ET')}")
-        lines.append(f"Portfolio: {len(portfolio.holdings)} holdings ({', '.join(portfolio.get_tickers())})")
-        lines.append("=" * 70)
+        buf = io.StringIO()
+        write = buf.write
+
+        write(f"{_DOUBLE_RULE}\nPORT-TRACKER RISK ANALYSIS\n")
+        write(f"Timestamp: {assessment.timestamp.strftime('%Y-%m-%d %H:%M:%S ET')}\n")
+        write(f"Portfolio: {len(portfolio.holdings)} holdings ({', '.join(portfolio.get_tickers())})\n")
+        write(f"{_DOUBLE_RULE}\n")
 
         # Overall assessment
-        risk_emoji = {
-            "LOW": "[OK]",
-            "MODERATE": "[~]",
-            "ELEVATED": "[!]",
-            "HIGH": "[!!]"
-        }
-        risk_icon = risk_emoji.get(assessment.overall_risk, "[?]")
+        risk_icon = _OVERALL_RISK_ICONS.get(assessment.overall_risk, "[?]")
 
-        lines.append(f"\nOVERALL RISK LEVEL: {risk_icon} {assessment.overall_risk}")
-        lines.append(f"Market Regime: {assessment.market_regime}")
-        lines.append(f"Summary: {assessment.summary}")
+        write(f"\nOVERALL RISK LEVEL: {risk_icon} {assessment.overall_risk}\n")
+        write(f"Market Regime: {assessment.market_regime}\n")
+        write(f"Summary: {assessment.summary}\n")
 
         # Critical and High risks
         critical_risks = [r for r in assessment.risks if r.severity in [RiskSeverity.CRITICAL, RiskSeverity.HIGH]]
         if critical_risks:
-            lines.append("\n" + "-" * 70)
-            lines.append("## CRITICAL / HIGH PRIORITY ALERTS")
-            lines.append("-" * 70)
+            write(f"\n{_RULE}\n## CRITICAL / HIGH PRIORITY ALERTS\n{_RULE}\n")
 
             for risk in critical_risks:
                 severity_icon = "[!!!]" if risk.severity == RiskSeverity.CRITICAL else "[!!]"
-                lines.append(f"\n{severity_icon} {risk.title}")
-                lines.append(f"Affected: {', '.join(risk.affected_holdings)}")
-                lines.append(f"Time Horizon: {risk.time_horizon}")
-                lines.append("")
-                lines.append(f"{risk.description}")
-                lines.append("")
-                lines.append("Leading Indicators Detected:")
+                write(f"\n{severity_icon} {risk.title}\n")
+                write(f"Affected: {', '.join(risk.affected_holdings)}\n")
+                write(f"Time Horizon: {risk.time_horizon}\n")
+                write(f"\n{risk.description}\n")
+                write("\nLeading Indicators Detected:\n")
                 for indicator in risk.leading_indicators:
-                    lines.append(f"  - {indicator}")
-                lines.append("")
-                lines.append(f"Historical Pattern:")
-                lines.append(f"  {risk.historical_pattern}")
-                lines.append("")
-                lines.append(f"Recommended Action: {risk.recommended_action.value}")
-                lines.append(f"Confidence: {risk.confidence}")
+                    write(f"  - {indicator}\n")
+                write("\nHistorical Pattern:\n")
+                write(f"  {risk.historical_pattern}\n")
+                write(f"\nRecommended Action: {risk.recommended_action.value}\n")
+                write(f"Confidence: {risk.confidence}\n")
 
         # Medium and Low risks
         other_risks = [r for r in assessment.risks if r.severity in [RiskSeverity.MEDIUM, RiskSeverity.LOW]]
         if other_risks:
-            lines.append("\n" + "-" * 70)
-            lines.append("## WATCH LIST")
-            lines.append("-" * 70)
+            write(f"\n{_RULE}\n## WATCH LIST\n{_RULE}\n")
 
             for risk in other_risks:
                 severity_icon = "[!]" if risk.severity == RiskSeverity.MEDIUM else "[i]"
-                lines.append(f"\n{severity_icon} {risk.title}")
-                lines.append(f"    Affected: {', '.join(risk.affected_holdings)}")
-                lines.append(f"    {risk.description[:200]}...")
-                lines.append(f"    Action: {risk.recommended_action.value}")
+                write(f"\n{severity_icon} {risk.title}\n")
+                write(f"    Affected: {', '.join(risk.affected_holdings)}\n")
+                write(f"    {risk.description[:200]}...\n")
+                write(f"    Action: {risk.recommended_action.value}\n")
 
         # Safe holdings
         if assessment.safe_holdings:
-            lines.append("\n" + "-" * 70)
-            lines.append("## SAFE HOLDINGS (No immediate risks detected)")
-            lines.append("-" * 70)
+            write(f"\n{_RULE}\n## SAFE HOLDINGS (No immediate risks detected)\n{_RULE}\n")
             for ticker in assessment.safe_holdings:
-                lines.append(f"  - {ticker}")
+                write(f"  - {ticker}\n")
 
         # No risks found
         if not assessment.risks:
-            lines.append("\n" + "-" * 70)
-            lines.append("## NO SIGNIFICANT RISKS DETECTED")
-            lines.append("-" * 70)
-            lines.append("Your portfolio appears stable. Continue monitoring.")
+            write(f"\n{_RULE}\n## NO SIGNIFICANT RISKS DETECTED\n{_RULE}\n")
+            write("Your portfolio appears stable. Continue monitoring.\n")
 
-        lines.append("\n" + "=" * 70)
+        write(f"\n{_DOUBLE_RULE}")
 
-        return "\n".join(lines)
+        return buf.getvalue()
@@ -6,10 +6,12 @@ This module provides a unified interface for working with multiple LLM providers
 through SAP AI Core. It supports OpenAI, Anthropic, and other models available
 in your SAP AI Core deployments.
 """
+import functools
 import warnings
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Tuple
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -27,7 +29,7 @@ class Provider(Enum):
     MISTRAL = "mistral"
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelConfig:
     """Configuration for a specific model."""
     model_name: str
@@ -77,6 +79,25 @@ AVAILABLE_MODELS: Dict[str, ModelConfig] = {
     ),
 }
 
+# Freeze the registry so it can be shared without defensive copies
+AVAILABLE_MODELS = MappingProxyType(AVAILABLE_MODELS)
+
+# Inverted index built once at import; per-provider lookups become a
+# single dict access instead of a scan over the whole registry
+_MODELS_BY_PROVIDER: Dict[Provider, Tuple[str, ...]] = {
+    provider: tuple(
+        key for key, config in AVAILABLE_MODELS.items()
+        if config.provider == provider
+    )
+    for provider in Provider
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_proxy_client(resource_group: str):
+    """Proxy client per resource group, built once per process."""
+    return get_proxy_client("gen-ai-hub", resource_group=resource_group)
+
 
 class LLMProvider:
     """
@@ -134,10 +155,7 @@ class LLMProvider:
         cache_key = f"{model_key}_{temperature}_{max_tokens}"
 
         if cache_key not in self._model_cache:
-            proxy_client = get_proxy_client(
-                "gen-ai-hub",
-                resource_group=config.resource_group
-            )
+            proxy_client = _get_proxy_client(config.resource_group)
 
             model = init_llm(
                 config.model_name,
@@ -162,16 +180,18 @@ class LLMProvider:
 
     def get_models_by_provider(self, provider: Provider) -> List[str]:
         """Get all models for a specific provider."""
-        return [
-            key for key, config in AVAILABLE_MODELS.items()
-            if config.provider == provider
-        ]
+        return list(_MODELS_BY_PROVIDER.get(provider, ()))
 
     def clear_cache(self) -> None:
         """Clear the model cache."""
         self._model_cache.clear()
 
 
+# Shared provider instance so get_llm callers reuse initialized models
+# instead of rebuilding the proxy client and model on every call
+_PROVIDER = LLMProvider()
+
+
 def get_llm(
     model_key: str = "gpt-4o",
     temperature: float = 0.7,
@@ -190,8 +210,7 @@ def get_llm(
     Returns:
         BaseLanguageModel: Initialized model
     """
-    provider = LLMProvider()
-    return provider.get_model(
+    return _PROVIDER.get_model(
         model_key,
         temperature=temperature,
         max_tokens=max_tokens,
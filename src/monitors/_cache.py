@@ -0,0 +1,99 @@
+"""
+Shared cross-process cache for the monitor modules.
+Thin Redis wrapper storing JSON values; degrades to a silent no-op when
+redis is not installed or unreachable, so the in-process dict caches in
+each monitor keep working on their own.
+"""
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    from diskcache import Cache as _DiskCache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+from src.utils import FileCache
+
+_client = None
+_client_failed = False
+
+
+def _get_client():
+    """Lazily connect once per process; never retry a failed connection."""
+    global _client, _client_failed
+    if not REDIS_AVAILABLE or _client_failed:
+        return None
+    if _client is None:
+        try:
+            client = redis.Redis(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=int(os.getenv('REDIS_PORT', '6379')),
+                socket_connect_timeout=0.25
+            )
+            client.ping()
+            _client = client
+        except Exception:
+            _client_failed = True
+    return _client
+
+
+def get_json(key: str) -> Optional[Any]:
+    """Get a cached JSON value, or None on miss or when Redis is down."""
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(key)
+    except Exception:
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def set_json(key: str, obj: Any, ttl_seconds: int) -> None:
+    """Store a JSON value with a TTL; silently no-ops when Redis is down."""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl_seconds, json.dumps(obj))
+    except Exception:
+        pass
+
+
+# Disk tier: survives restarts without a Redis server. diskcache is the
+# preferred backend when installed; the repo's pickle-based FileCache
+# covers the rest.
+if DISKCACHE_AVAILABLE:
+    _disk = _DiskCache('.ptcache/searches')
+
+    def disk_get(key: Any, ttl_seconds: int) -> Optional[Any]:
+        """Get a disk-cached value, or None on miss or expiry."""
+        try:
+            return _disk.get(key)
+        except Exception:
+            return None
+
+    def disk_set(key: Any, value: Any, ttl_seconds: int) -> None:
+        """Store a value on disk with a TTL; best-effort."""
+        try:
+            _disk.set(key, value, expire=ttl_seconds)
+        except Exception:
+            pass
+else:
+    _disk = FileCache('.ptcache/searches')
+
+    def disk_get(key: Any, ttl_seconds: int) -> Optional[Any]:
+        """Get a disk-cached value, or None on miss or expiry."""
+        return _disk.get(key, ttl_seconds)
+
+    def disk_set(key: Any, value: Any, ttl_seconds: int) -> None:
+        """Store a value on disk with a TTL; best-effort."""
+        _disk.set(key, value)
@@ -0,0 +1,50 @@
+"""
+Divergence comparison kernel for the correlation tracker.
+Plain-Python definition JIT-compiled with numba when installed; callers
+get the same function as pure Python otherwise.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Flags emitted by check_pairs; 0 means no divergence
+SAME_DIRECTION = 1      # negatively correlated pair moving together
+LAGGED = 2              # one side moving strongly, the other flat
+OPPOSITE_DIRECTION = 3  # positively correlated pair moving apart
+
+
+def check_pairs(ch1, ch2, ctype, out_flags, out_sev):
+    """
+    Classify correlation pairs by their daily changes.
+
+    ch1/ch2 hold change_pct for each pair, ctype is +1 for positive and
+    -1 for negative correlations. Writes a flag code per pair into
+    out_flags and 1 into out_sev where the divergence is HIGH severity.
+    """
+    for i in range(ch1.size):
+        c1 = ch1[i]
+        c2 = ch2[i]
+        flag = 0
+        sev = 0
+        if ctype[i] == -1:
+            # Negative correlation: expect opposite movements
+            if (c1 > 1.0 and c2 > 1.0) or (c1 < -1.0 and c2 < -1.0):
+                flag = SAME_DIRECTION
+                if abs(c1) > 2.0 or abs(c2) > 2.0:
+                    sev = 1
+            elif abs(c1) > 2.0 and abs(c2) < 0.5:
+                flag = LAGGED
+        else:
+            # Positive correlation: expect same direction
+            if (c1 > 1.0 and c2 < -1.0) or (c1 < -1.0 and c2 > 1.0):
+                flag = OPPOSITE_DIRECTION
+                if abs(c1 - c2) > 3.0:
+                    sev = 1
+        out_flags[i] = flag
+        out_sev[i] = sev
+
+
+if NUMBA_AVAILABLE:
+    check_pairs = njit(cache=True)(check_pairs)
@@ -2,19 +2,61 @@
 Correlation Tracker for Port-Tracker.
 Tracks correlated assets and detects divergences.
 """
+import io
 import os
+import pickle
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from pathlib import Path
 from typing import List, Dict, Optional
-from enum import Enum
+from enum import IntEnum
 
+import numpy as np
+import requests
 import yfinance as yf
-
-
-class CorrelationType(Enum):
-    """Type of correlation between assets."""
-    POSITIVE = "positive"  # Assets move together
-    NEGATIVE = "negative"  # Assets move inversely
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.monitors import _cache, _corr_kernel
+
+# Shared HTTP session for yfinance calls: pooled connections keep TLS
+# warm across ticker fetches, with Retry-After-aware backoff on Yahoo
+# rate limits and transient server errors
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'Accept-Encoding': 'gzip',
+    'User-Agent': 'Mozilla/5.0'
+})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+))
+
+# yf.download batches up to ~20 symbols into one Yahoo request
+_BULK_CHUNK_SIZE = 20
+
+# TTL for price snapshots in the shared cache (matches the 5-minute
+# in-process cache window)
+_PRICE_TTL_SECONDS = 300
+
+# On-disk snapshot of the price cache for warm starts across processes
+_PRICE_CACHE_PATH = Path('.ptcache/prices.pkl')
+
+
+class CorrelationType(IntEnum):
+    """
+    Type of correlation between assets.
+
+    Int-valued so the sign feeds the divergence kernel directly and
+    comparisons are C-level integer compares.
+    """
+    POSITIVE = 1   # Assets move together
+    NEGATIVE = -1  # Assets move inversely
 
 
 @dataclass
@@ -30,6 +72,53 @@ class AssetPrice:
     consecutive_down_days: int = 0
 
 
+class AssetPriceTable:
+    """
+    Structure-of-arrays view over a batch of AssetPrice records.
+
+    Parallel NumPy columns keep the fields the divergence kernel reads
+    contiguous in memory instead of scattered across dataclass
+    instances; row() materializes an AssetPrice for callers that still
+    want the record form.
+    """
+
+    def __init__(self, prices):
+        prices = list(prices)
+        n = len(prices)
+        self.idx: Dict[str, int] = {p.ticker: i for i, p in enumerate(prices)}
+        self.ticker = np.empty(n, dtype=object)
+        self.price = np.zeros(n, dtype=np.float32)
+        self.change_pct = np.zeros(n, dtype=np.float32)
+        self.change_5d_pct = np.zeros(n, dtype=np.float32)
+        self.at_high = np.zeros(n, dtype=bool)
+        self.at_low = np.zeros(n, dtype=bool)
+        self.consecutive_up_days = np.zeros(n, dtype=np.int16)
+        self.consecutive_down_days = np.zeros(n, dtype=np.int16)
+        for i, p in enumerate(prices):
+            self.ticker[i] = p.ticker
+            self.price[i] = p.price
+            self.change_pct[i] = p.change_pct
+            self.change_5d_pct[i] = p.change_5d_pct
+            self.at_high[i] = p.at_high
+            self.at_low[i] = p.at_low
+            self.consecutive_up_days[i] = p.consecutive_up_days
+            self.consecutive_down_days[i] = p.consecutive_down_days
+
+    def row(self, ticker: str) -> AssetPrice:
+        """Materialize the AssetPrice record for one ticker."""
+        i = self.idx[ticker]
+        return AssetPrice(
+            ticker=self.ticker[i],
+            price=float(self.price[i]),
+            change_pct=float(self.change_pct[i]),
+            change_5d_pct=float(self.change_5d_pct[i]),
+            at_high=bool(self.at_high[i]),
+            at_low=bool(self.at_low[i]),
+            consecutive_up_days=int(self.consecutive_up_days[i]),
+            consecutive_down_days=int(self.consecutive_down_days[i])
+        )
+
+
 @dataclass
 class Divergence:
     """A detected divergence between correlated assets."""
@@ -71,6 +160,28 @@ class CorrelationTracker:
         self._price_cache: Dict[str, AssetPrice] = {}
         self._cache_time: Optional[datetime] = None
 
+        # Warm start: reload the previous run's snapshot so a re-run
+        # within the cache window skips the downloads entirely
+        try:
+            saved = pickle.loads(_PRICE_CACHE_PATH.read_bytes())
+            self._price_cache = saved['prices']
+            self._cache_time = saved['cache_time']
+        except Exception:
+            pass
+
+    def _save_cache(self) -> None:
+        """Best-effort atomic write of the price cache for warm starts."""
+        try:
+            _PRICE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = _PRICE_CACHE_PATH.with_suffix('.tmp')
+            tmp.write_bytes(pickle.dumps(
+                {'prices': self._price_cache, 'cache_time': self._cache_time},
+                protocol=pickle.HIGHEST_PROTOCOL
+            ))
+            os.replace(tmp, _PRICE_CACHE_PATH)
+        except OSError:
+            pass
+
     def get_price_data(self, ticker: str) -> Optional[AssetPrice]:
         """
         Get current price data for a ticker.
@@ -86,50 +197,109 @@ class CorrelationTracker:
             if ticker in self._price_cache:
                 return self._price_cache[ticker]
 
+        # Shared cache next: another process may have fetched this ticker
+        cached = _cache.get_json(f"ap:{ticker}")
+        if cached is not None:
+            price_data = AssetPrice(**cached)
+            self._price_cache[ticker] = price_data
+            return price_data
+
         try:
-            yf_ticker = yf.Ticker(ticker)
+            hist = yf.Ticker(ticker, session=_SESSION).history(period='1y')
+        except Exception as e:
+            print(f"Error fetching {ticker}: {e}")
+            return None
+
+        return self._price_from_hist(ticker, hist)
+
+    def _prefetch(self, tickers: List[str]) -> None:
+        """
+        Fetch 1y history for many tickers in batched yf.download calls
+        and fill the price cache, collapsing N per-ticker requests into
+        one request per chunk of tickers.
+        """
+        now = datetime.now()
+        if self._cache_time and (now - self._cache_time).seconds < 300:
+            missing = [t for t in tickers if t not in self._price_cache]
+        else:
+            missing = list(tickers)
+
+        # Pull shared-cache hits before going to the network
+        still_missing = []
+        for ticker in missing:
+            cached = _cache.get_json(f"ap:{ticker}")
+            if cached is not None:
+                self._price_cache[ticker] = AssetPrice(**cached)
+            else:
+                still_missing.append(ticker)
+        missing = still_missing
+        if not missing:
+            return
 
-            # Get recent history
-            hist = yf_ticker.history(period='10d')
-            if len(hist) < 2:
+        for start in range(0, len(missing), _BULK_CHUNK_SIZE):
+            chunk = missing[start:start + _BULK_CHUNK_SIZE]
+            try:
+                data = yf.download(
+                    ' '.join(chunk),
+                    period='1y',
+                    group_by='ticker',
+                    threads=True,
+                    auto_adjust=True,
+                    progress=False,
+                    session=_SESSION
+                )
+            except Exception as e:
+                print(f"Error fetching {', '.join(chunk)}: {e}")
+                continue
+
+            for ticker in chunk:
+                try:
+                    hist = data[ticker].dropna(how='all')
+                except KeyError:
+                    # Older yfinance returns single-symbol downloads flat,
+                    # without the ticker column level; newer versions keep
+                    # it, so normalize by shape rather than chunk size
+                    if len(chunk) > 1:
+                        continue
+                    hist = data
+                self._price_from_hist(ticker, hist)
+
+    def _price_from_hist(self, ticker: str, hist) -> Optional[AssetPrice]:
+        """Build and cache an AssetPrice from a 1y history DataFrame."""
+        try:
+            if hist is None or len(hist) < 2:
                 return None
 
-            current_price = hist['Close'].iloc[-1]
-            prev_close = hist['Close'].iloc[-2]
-            change_pct = ((current_price - prev_close) / prev_close) * 100
+            # One array extraction; changes and streaks come straight
+            # off it instead of per-element iloc dispatch. The full year
+            # gives the 52-week levels; short-term math uses the tail.
+            closes_1y = hist['Close'].to_numpy(dtype=np.float64)
+            closes = closes_1y[-10:]
+            current_price = float(closes[-1])
+            prev_close = closes[-2]
+            change_pct = float(((current_price - prev_close) / prev_close) * 100)
 
             # 5-day change
-            if len(hist) >= 5:
-                five_day_ago = hist['Close'].iloc[-5]
-                change_5d_pct = ((current_price - five_day_ago) / five_day_ago) * 100
+            if closes.size >= 5:
+                five_day_ago = closes[-5]
+                change_5d_pct = float(((current_price - five_day_ago) / five_day_ago) * 100)
             else:
-                change_5d_pct = 0
-
-            # Count consecutive up/down days
-            consecutive_up = 0
-            consecutive_down = 0
-            for i in range(len(hist) - 1, 0, -1):
-                if hist['Close'].iloc[i] > hist['Close'].iloc[i-1]:
-                    if consecutive_down == 0:
-                        consecutive_up += 1
-                    else:
-                        break
-                else:
-                    if consecutive_up == 0:
-                        consecutive_down += 1
-                    else:
-                        break
-
-            # Check if at high/low
-            try:
-                info = yf_ticker.info
-                high_52w = info.get('fiftyTwoWeekHigh', current_price * 1.1)
-                low_52w = info.get('fiftyTwoWeekLow', current_price * 0.9)
-                at_high = current_price >= high_52w * 0.98
-                at_low = current_price <= low_52w * 1.02
-            except:
-                at_high = False
-                at_low = False
+                change_5d_pct = 0.0
+
+            # Trailing streak via one vectorized pass (same reversed
+            # comparison as the pattern detector; equal closes count down)
+            up = np.diff(closes) > 0
+            breaks = np.nonzero(up[::-1] != up[-1])[0]
+            run_len = int(breaks[0]) if breaks.size else up.size
+            consecutive_up = run_len if up[-1] else 0
+            consecutive_down = 0 if up[-1] else run_len
+
+            # 52-week levels straight off the downloaded year; avoids the
+            # second (and much slower) .info request per ticker
+            high_52w = float(closes_1y.max())
+            low_52w = float(closes_1y.min())
+            at_high = current_price >= high_52w * 0.98
+            at_low = current_price <= low_52w * 1.02
 
             price_data = AssetPrice(
                 ticker=ticker,
@@ -144,11 +314,12 @@ class CorrelationTracker:
 
             self._price_cache[ticker] = price_data
             self._cache_time = datetime.now()
+            _cache.set_json(f"ap:{ticker}", asdict(price_data), _PRICE_TTL_SECONDS)
 
             return price_data
 
         except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
+            print(f"Error processing {ticker}: {e}")
             return None
 
     def detect_divergences(self, tickers: List[str]) -> List[Divergence]:
@@ -163,79 +334,99 @@ class CorrelationTracker:
         """
         divergences = []
 
-        # Get price data for all tickers
+        # Get price data for all tickers (batched, fills the cache)
+        self._prefetch(tickers)
         prices = {}
         for ticker in tickers:
             price_data = self.get_price_data(ticker)
             if price_data:
                 prices[ticker] = price_data
 
-        # Check known correlations
-        for (t1, t2), corr_type in ASSET_CORRELATIONS.items():
-            if t1 in prices and t2 in prices:
-                p1 = prices[t1]
-                p2 = prices[t2]
-
-                divergence = self._check_divergence(p1, p2, corr_type)
-                if divergence:
-                    divergences.append(divergence)
+        # One snapshot per run is enough to warm the next process
+        self._save_cache()
+
+        # SoA table over the fetched prices: the kernel reads contiguous
+        # change columns gathered by index arrays, and Divergence objects
+        # are built only for flagged rows
+        tbl = AssetPriceTable(prices.values())
+        pairs = [
+            (t1, t2, corr_type)
+            for (t1, t2), corr_type in ASSET_CORRELATIONS.items()
+            if t1 in tbl.idx and t2 in tbl.idx
+        ]
+        if not pairs:
+            return divergences
+
+        n = len(pairs)
+        a_idx = np.fromiter(
+            (tbl.idx[t1] for t1, _, _ in pairs), dtype=np.intp, count=n
+        )
+        b_idx = np.fromiter(
+            (tbl.idx[t2] for _, t2, _ in pairs), dtype=np.intp, count=n
+        )
+        ctype = np.fromiter(
+            (int(corr) for _, _, corr in pairs), dtype=np.int8, count=n
+        )
+        flags = np.zeros(n, dtype=np.int8)
+        sev = np.zeros(n, dtype=np.int8)
+        _corr_kernel.check_pairs(
+            tbl.change_pct[a_idx], tbl.change_pct[b_idx], ctype, flags, sev
+        )
+
+        for i in np.nonzero(flags)[0]:
+            t1, t2, corr_type = pairs[i]
+            divergences.append(self._build_divergence(
+                tbl.row(t1), tbl.row(t2), corr_type, int(flags[i]), int(sev[i])
+            ))
 
         return divergences
 
-    def _check_divergence(
+    def _build_divergence(
         self,
         p1: AssetPrice,
         p2: AssetPrice,
-        corr_type: CorrelationType
-    ) -> Optional[Divergence]:
-        """Check for divergence between two assets."""
-
-        if corr_type == CorrelationType.NEGATIVE:
-            # Negative correlation: expect opposite movements
-            # Divergence if both moving same direction significantly
-            if (p1.change_pct > 1 and p2.change_pct > 1) or \
-               (p1.change_pct < -1 and p2.change_pct < -1):
-                severity = "HIGH" if abs(p1.change_pct) > 2 or abs(p2.change_pct) > 2 else "MEDIUM"
-                return Divergence(
-                    asset1=p1.ticker,
-                    asset2=p2.ticker,
-                    correlation_type=corr_type,
-                    expected_behavior=f"{p1.ticker} and {p2.ticker} should move opposite",
-                    actual_behavior=f"Both moving {'up' if p1.change_pct > 0 else 'down'}",
-                    severity=severity,
-                    description=f"{p1.ticker} {p1.change_pct:+.1f}% while {p2.ticker} {p2.change_pct:+.1f}% - "
-                               f"historically negative correlation suggests reversion"
-                )
-
-            # Also flag if one is moving strongly while other is flat
-            if abs(p1.change_pct) > 2 and abs(p2.change_pct) < 0.5:
-                return Divergence(
-                    asset1=p1.ticker,
-                    asset2=p2.ticker,
-                    correlation_type=corr_type,
-                    expected_behavior=f"{p2.ticker} should react to {p1.ticker} move",
-                    actual_behavior=f"{p1.ticker} moving {p1.change_pct:+.1f}% but {p2.ticker} flat",
-                    severity="MEDIUM",
-                    description=f"Lagged correlation - {p2.ticker} may catch up to {p1.ticker}'s move"
-                )
+        corr_type: CorrelationType,
+        flag: int,
+        severity_code: int
+    ) -> Divergence:
+        """Materialize a Divergence for a pair the kernel flagged."""
+        severity = "HIGH" if severity_code else "MEDIUM"
+
+        if flag == _corr_kernel.SAME_DIRECTION:
+            # Negatively correlated pair moving the same way
+            return Divergence(
+                asset1=p1.ticker,
+                asset2=p2.ticker,
+                correlation_type=corr_type,
+                expected_behavior=f"{p1.ticker} and {p2.ticker} should move opposite",
+                actual_behavior=f"Both moving {'up' if p1.change_pct > 0 else 'down'}",
+                severity=severity,
+                description=f"{p1.ticker} {p1.change_pct:+.1f}% while {p2.ticker} {p2.change_pct:+.1f}% - "
+                           f"historically negative correlation suggests reversion"
+            )
 
-        elif corr_type == CorrelationType.POSITIVE:
-            # Positive correlation: expect same direction
-            # Divergence if moving opposite directions significantly
-            if (p1.change_pct > 1 and p2.change_pct < -1) or \
-               (p1.change_pct < -1 and p2.change_pct > 1):
-                severity = "HIGH" if abs(p1.change_pct - p2.change_pct) > 3 else "MEDIUM"
-                return Divergence(
-                    asset1=p1.ticker,
-                    asset2=p2.ticker,
-                    correlation_type=corr_type,
-                    expected_behavior=f"{p1.ticker} and {p2.ticker} should move together",
-                    actual_behavior=f"Moving opposite: {p1.ticker} {p1.change_pct:+.1f}%, {p2.ticker} {p2.change_pct:+.1f}%",
-                    severity=severity,
-                    description=f"Unusual divergence - one may be mispriced or leading indicator"
-                )
+        if flag == _corr_kernel.LAGGED:
+            # One side moving strongly while the other is flat
+            return Divergence(
+                asset1=p1.ticker,
+                asset2=p2.ticker,
+                correlation_type=corr_type,
+                expected_behavior=f"{p2.ticker} should react to {p1.ticker} move",
+                actual_behavior=f"{p1.ticker} moving {p1.change_pct:+.1f}% but {p2.ticker} flat",
+                severity="MEDIUM",
+                description=f"Lagged correlation - {p2.ticker} may catch up to {p1.ticker}'s move"
+            )
 
-        return None
+        # Positively correlated pair moving apart
+        return Divergence(
+            asset1=p1.ticker,
+            asset2=p2.ticker,
+            correlation_type=corr_type,
+            expected_behavior=f"{p1.ticker} and {p2.ticker} should move together",
+            actual_behavior=f"Moving opposite: {p1.ticker} {p1.change_pct:+.1f}%, {p2.ticker} {p2.change_pct:+.1f}%",
+            severity=severity,
+            description=f"Unusual divergence - one may be mispriced or leading indicator"
+        )
 
     def detect_streak_risk(self, ticker: str) -> Optional[str]:
         """
@@ -283,26 +474,28 @@ class CorrelationTracker:
 
     def format_for_llm(self, tickers: List[str]) -> str:
         """Format correlation data for LLM prompt."""
-        lines = []
-        lines.append("## Correlated Asset Analysis")
-        lines.append("")
+        buf = io.StringIO()
+        write = buf.write
+        write("## Correlated Asset Analysis\n\n")
 
         # Get divergences
         divergences = self.detect_divergences(tickers)
         if divergences:
-            lines.append("### Detected Divergences")
+            write("### Detected Divergences\n")
             for d in divergences:
-                lines.append(f"- [{d.severity}] {d.asset1} vs {d.asset2}: {d.description}")
-            lines.append("")
+                write(f"- [{d.severity}] {d.asset1} vs {d.asset2}: {d.description}\n")
+            write("\n")
 
         # Check streaks for key assets
-        lines.append("### Streak Analysis")
+        write("### Streak Analysis\n")
+        wrote_streak = False
         for ticker in tickers[:5]:
             streak_risk = self.detect_streak_risk(ticker)
             if streak_risk:
-                lines.append(f"- {streak_risk}")
+                write(f"- {streak_risk}\n")
+                wrote_streak = True
 
-        if len(lines) == 3:  # Only headers
-            lines.append("- No significant patterns detected")
+        if not divergences and not wrote_streak:  # Only headers
+            write("- No significant patterns detected\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()[:-1]
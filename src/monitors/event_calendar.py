@@ -2,7 +2,9 @@
 Event Calendar Monitor for Port-Tracker.
 Tracks scheduled economic events that could impact holdings.
 """
+import io
 import os
+import re
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
@@ -17,7 +19,21 @@ try:
 except ImportError:
     TAVILY_AVAILABLE = False
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from src.portfolio.holdings import Portfolio
+from src.monitors import _cache
+
+# TTL for calendar results in the shared cache; the event set changes
+# slowly within a trading day
+_CALENDAR_TTL_SECONDS = 3600
+
+# TTL for memoized Tavily searches on the disk tier
+_SEARCH_DISK_TTL_SECONDS = 600
 
 
 class EventType(Enum):
@@ -59,6 +75,19 @@ class ScheduledEvent:
         }
 
 
+def _event_from_dict(d: dict) -> ScheduledEvent:
+    """Rebuild a ScheduledEvent from its to_dict representation."""
+    return ScheduledEvent(
+        name=d['name'],
+        event_type=EventType(d['event_type']),
+        date=datetime.fromisoformat(d['date']),
+        impact=EventImpact(d['impact']),
+        description=d.get('description', ''),
+        affected_sectors=list(d.get('affected_sectors', [])),
+        affected_tickers=list(d.get('affected_tickers', []))
+    )
+
+
 # Known recurring events and their typical impacts
 KNOWN_EVENTS = {
     "FOMC": {
@@ -99,6 +128,34 @@ KNOWN_EVENTS = {
     }
 }
 
+# Keyword index built once at import: each known event with its lowered
+# keywords, plus a compiled alternation over the leading keywords used
+# as a cheap gate before the per-event membership checks. Deliberately
+# unanchored: the per-event checks use plain substring matching, and the
+# gate must accept everything they would ("NFPs", "cpidata") to only
+# ever skip true negatives.
+_EVENT_KW = [
+    (name, info, [kw.lower() for kw in name.split()])
+    for name, info in KNOWN_EVENTS.items()
+]
+_EVENT_RE = re.compile(
+    '|'.join(re.escape(kws[0]) for _, _, kws in _EVENT_KW)
+)
+
+# With pyahocorasick installed, one automaton pass over the result text
+# reports every keyword hit at once instead of nested substring scans
+if AHOCORASICK_AVAILABLE:
+    _EVENT_AUTOMATON = ahocorasick.Automaton()
+    for _, _, _kws in _EVENT_KW:
+        for _kw in _kws:
+            _EVENT_AUTOMATON.add_word(_kw, _kw)
+    _EVENT_AUTOMATON.make_automaton()
+else:
+    _EVENT_AUTOMATON = None
+
+# Impact icons for the LLM formatter
+_IMPACT_ICONS = {"high": "[!!!]", "medium": "[!!]", "low": "[!]"}
+
 
 class EventCalendar:
     """Monitors economic calendar for upcoming events."""
@@ -123,6 +180,12 @@ class EventCalendar:
         Returns:
             List of scheduled events
         """
+        # Shared cache: one process per day/window pays for the searches
+        cache_key = f"ev:{datetime.now().date().isoformat()}:{days_ahead}"
+        cached = _cache.get_json(cache_key)
+        if cached is not None:
+            return [_event_from_dict(d) for d in cached]
+
         events = []
 
         # Search for economic calendar events
@@ -133,17 +196,15 @@ class EventCalendar:
         if self.tavily:
             events.extend(self._search_fed_events(days_ahead))
 
-        # Deduplicate by name
-        seen = set()
-        unique_events = []
+        # Deduplicate by name in one keyed pass, then sort by date
+        unique: Dict[str, ScheduledEvent] = {}
         for event in events:
-            if event.name.lower() not in seen:
-                seen.add(event.name.lower())
-                unique_events.append(event)
-
-        # Sort by date
-        unique_events.sort(key=lambda e: e.date)
+            unique.setdefault(event.name.lower(), event)
+        unique_events = sorted(unique.values(), key=lambda e: e.date)
 
+        _cache.set_json(
+            cache_key, [e.to_dict() for e in unique_events], _CALENDAR_TTL_SECONDS
+        )
         return unique_events
 
     def _search_economic_calendar(self, days_ahead: int) -> List[ScheduledEvent]:
@@ -162,6 +223,12 @@ class EventCalendar:
         - Retail sales
         """
 
+        # Disk memo: the same calendar query repeats across runs
+        disk_key = ('calendar-econ', today, days_ahead)
+        cached = _cache.disk_get(disk_key, _SEARCH_DISK_TTL_SECONDS)
+        if cached is not None:
+            return [_event_from_dict(d) for d in cached]
+
         try:
             result = self.tavily.search(query, max_results=5)
             events = []
@@ -175,6 +242,9 @@ class EventCalendar:
                 if event:
                     events.append(event)
 
+            _cache.disk_set(
+                disk_key, [e.to_dict() for e in events], _SEARCH_DISK_TTL_SECONDS
+            )
             return events
         except Exception as e:
             print(f"Calendar search error: {e}")
@@ -187,6 +257,11 @@ class EventCalendar:
 
         query = "Federal Reserve FOMC meeting schedule Powell speech this week"
 
+        disk_key = ('calendar-fed', datetime.now().date().isoformat(), days_ahead)
+        cached = _cache.disk_get(disk_key, _SEARCH_DISK_TTL_SECONDS)
+        if cached is not None:
+            return [_event_from_dict(d) for d in cached]
+
         try:
             result = self.tavily.search(query, max_results=3)
             events = []
@@ -204,6 +279,9 @@ class EventCalendar:
                         affected_sectors=["precious_metals", "tech", "financials"]
                     ))
 
+            _cache.disk_set(
+                disk_key, [e.to_dict() for e in events], _SEARCH_DISK_TTL_SECONDS
+            )
             return events
         except Exception as e:
             print(f"Fed events search error: {e}")
@@ -213,19 +291,39 @@ class EventCalendar:
         """Parse a scheduled event from search result."""
         combined = (title + " " + content).lower()
 
-        for event_name, event_info in KNOWN_EVENTS.items():
-            keywords = event_name.lower().split()
-            if all(kw in combined for kw in keywords):
-                return ScheduledEvent(
-                    name=event_name,
-                    event_type=event_info["type"],
-                    date=datetime.now() + timedelta(days=1),  # Approximate
-                    impact=event_info["impact"],
-                    description=event_info["description"],
-                    affected_sectors=event_info["affected_sectors"]
-                )
-
-        return None
+        # Both paths match keywords as plain substrings (baseline
+        # semantics); they differ only in how membership is answered.
+        # The automaton collects every keyword hit in one pass, the
+        # fallback gates on the alternation then probes the text.
+        if _EVENT_AUTOMATON is not None:
+            hits = {kw for _, kw in _EVENT_AUTOMATON.iter(combined)}
+            if not hits:
+                return None
+            contains = hits.__contains__
+        else:
+            # Fast rejection: most results mention no known event at all
+            if not _EVENT_RE.search(combined):
+                return None
+            contains = combined.__contains__
+
+        matched = None
+        for event_name, event_info, keywords in _EVENT_KW:
+            if all(contains(kw) for kw in keywords):
+                matched = (event_name, event_info)
+                break
+
+        if matched is None:
+            return None
+
+        event_name, event_info = matched
+        return ScheduledEvent(
+            name=event_name,
+            event_type=event_info["type"],
+            date=datetime.now() + timedelta(days=1),  # Approximate
+            impact=event_info["impact"],
+            description=event_info["description"],
+            affected_sectors=event_info["affected_sectors"]
+        )
 
     def match_events_to_holdings(
         self,
@@ -242,7 +340,14 @@ class EventCalendar:
         Returns:
             Events with affected_tickers populated
         """
+        # Snapshot the portfolio accessors once instead of re-invoking
+        # them inside the per-event loop
         portfolio_sectors = portfolio.get_sectors()
+        all_tickers = portfolio.get_tickers()
+        tickers_by_sector = {
+            sector: [h.ticker for h in portfolio.get_holdings_by_sector(sector)]
+            for sector in portfolio_sectors
+        }
 
         for event in events:
             affected_tickers = []
@@ -250,10 +355,9 @@ class EventCalendar:
             # Match by sector
             for sector in event.affected_sectors:
                 if sector == "all":
-                    affected_tickers.extend(portfolio.get_tickers())
+                    affected_tickers.extend(all_tickers)
                 elif sector in portfolio_sectors:
-                    for h in portfolio.get_holdings_by_sector(sector):
-                        affected_tickers.append(h.ticker)
+                    affected_tickers.extend(tickers_by_sector[sector])
 
             event.affected_tickers = list(set(affected_tickers))
 
@@ -264,21 +368,19 @@ class EventCalendar:
         if not events:
             return "No significant upcoming events detected."
 
-        lines = []
-        lines.append(f"## Upcoming Events ({len(events)} found)")
-        lines.append("")
+        buf = io.StringIO()
+        write = buf.write
+        write(f"## Upcoming Events ({len(events)} found)\n\n")
 
         for event in events[:5]:  # Limit to 5
-            impact_icon = {"high": "[!!!]", "medium": "[!!]", "low": "[!]"}
-            icon = impact_icon.get(event.impact.value, "[?]")
+            icon = _IMPACT_ICONS.get(event.impact.value, "[?]")
 
-            lines.append(f"### {icon} {event.name}")
-            lines.append(f"    Type: {event.event_type.value.upper()}")
-            lines.append(f"    Impact: {event.impact.value.upper()}")
-            lines.append(f"    Sectors: {', '.join(event.affected_sectors)}")
+            write(f"### {icon} {event.name}\n")
+            write(f"    Type: {event.event_type.value.upper()}\n")
+            write(f"    Impact: {event.impact.value.upper()}\n")
+            write(f"    Sectors: {', '.join(event.affected_sectors)}\n")
             if event.affected_tickers:
-                lines.append(f"    Your Holdings: {', '.join(event.affected_tickers)}")
-            lines.append(f"    {event.description}")
-            lines.append("")
+                write(f"    Your Holdings: {', '.join(event.affected_tickers)}\n")
+            write(f"    {event.description}\n\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()[:-1]
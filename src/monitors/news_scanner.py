@@ -2,23 +2,71 @@
 News Scanner for Port-Tracker.
 Monitors news for portfolio-relevant events using Tavily/Perplexity.
 """
+import asyncio
+import hashlib
+import io
 import os
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv()
 
+try:
+    from blake3 import blake3 as _content_hash
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    from hashlib import blake2b as _content_hash
+    BLAKE3_AVAILABLE = False
+
 try:
     from tavily import TavilyClient
     TAVILY_AVAILABLE = True
 except ImportError:
     TAVILY_AVAILABLE = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 from src.portfolio.holdings import Portfolio
+from src.monitors import _cache
 from src.monitors.perplexity_search import PerplexitySearch
 
+# TTL for Tavily results in the shared cache; news queries repeat across
+# monitor runs and across processes within a 15-minute window
+_TAVILY_TTL_SECONDS = 900
+
+# TTL for the disk tier, which survives restarts without Redis
+_SEARCH_DISK_TTL_SECONDS = 600
+
+# Tavily HTTP API, used directly by the async scan path
+_TAVILY_API_URL = "https://api.tavily.com/search"
+
+# Concurrent in-flight Tavily searches; bounded to respect per-key limits
+_MAX_CONCURRENT_SEARCHES = 8
+
+# Higher-signal outlets, applied only when PT_TRUSTED_DOMAINS is set in
+# the environment
+_TRUSTED_DOMAINS = (
+    "reuters.com", "bloomberg.com", "ft.com", "wsj.com", "cnbc.com"
+)
+
+# Canned queries per known sector, built once at import
+_SECTOR_QUERIES = {
+    "precious_metals": "gold silver precious metals market news today",
+    "tech": "technology stocks Nasdaq tech sector news today",
+    "energy": "oil energy sector stocks news today",
+    "financials": "financial banks stocks sector news today",
+    "healthcare": "healthcare pharma biotech stocks news today"
+}
+
 
 @dataclass
 class NewsItem:
@@ -45,16 +93,43 @@ class NewsItem:
         }
 
 
+def _dedupe_key(item: NewsItem) -> tuple:
+    """
+    Canonical URL plus a short content fingerprint.
+
+    Keying on the bare netloc+path and a hash of the leading title and
+    content catches the same article resurfacing under tracker-tagged
+    URLs (?utm_source=...) across sources.
+    """
+    parsed = urlparse(item.url)
+    fingerprint = _content_hash(
+        (item.title.lower()[:80] + item.content[:200]).encode()
+    ).digest()[:8]
+    return (parsed.netloc + parsed.path, fingerprint)
+
+
+def _news_from_dict(d: dict) -> NewsItem:
+    """Rebuild a NewsItem from its to_dict representation."""
+    published = d.get('published')
+    return NewsItem(
+        title=d.get('title', ''),
+        content=d.get('content', ''),
+        url=d.get('url', ''),
+        source=d.get('source', 'tavily'),
+        published=datetime.fromisoformat(published) if published else None,
+        relevance_score=d.get('relevance_score', 0.0),
+        affected_tickers=list(d.get('affected_tickers', [])),
+        sentiment=d.get('sentiment', 'NEUTRAL')
+    )
+
+
 class NewsScanner:
     """Scans news sources for portfolio-relevant events."""
 
     def __init__(self, use_perplexity: bool = True):
-        if TAVILY_AVAILABLE:
-            api_key = os.getenv('TAVILY_API_KEY')
-            if api_key:
-                self.tavily = TavilyClient(api_key=api_key)
-            else:
-                self.tavily = None
+        self._api_key = os.getenv('TAVILY_API_KEY')
+        if TAVILY_AVAILABLE and self._api_key:
+            self.tavily = TavilyClient(api_key=self._api_key)
         else:
             self.tavily = None
 
@@ -66,46 +141,83 @@ class NewsScanner:
         """
         Scan news for all holdings, correlated assets, and sectors.
 
+        All searches run concurrently when httpx is available; each is a
+        blocking HTTP round-trip, so fanning out collapses N serial
+        round-trips into roughly one.
+
         Args:
             portfolio: User's portfolio
 
         Returns:
             List of relevant news items
         """
-        all_news = []
+        searches = self._portfolio_searches(portfolio)
 
-        # 1. Scan direct holdings
-        for holding in portfolio.holdings:
-            news = self._search_ticker_news(holding.ticker, holding.name)
+        if HTTPX_AVAILABLE:
+            results = asyncio.run(self._gather_searches(searches))
+        else:
+            results = [
+                self._search_general(query, max_results=max_results)
+                for _, query, max_results in searches
+            ]
+
+        # Stream into a keyed dict: duplicates are dropped as they
+        # arrive and their ticker tags merged, instead of collecting
+        # everything and deduplicating in a second pass
+        unique_news: Dict[tuple, NewsItem] = {}
+        for (tag_tickers, _, _), news in zip(searches, results):
             for item in news:
-                item.affected_tickers.append(holding.ticker)
-            all_news.extend(news)
+                key = _dedupe_key(item)
+                existing = unique_news.get(key)
+                if existing is None:
+                    existing = unique_news.setdefault(key, item)
+                if tag_tickers:
+                    existing.affected_tickers = list(
+                        dict.fromkeys(existing.affected_tickers + tag_tickers)
+                    )
+
+        return list(unique_news.values())
+
+    def _portfolio_searches(
+        self, portfolio: Portfolio
+    ) -> List[Tuple[List[str], str, int]]:
+        """Build the (affected tickers, query, max_results) search plan."""
+        searches = []
+
+        # 1. Direct holdings
+        for holding in portfolio.holdings:
+            searches.append((
+                [holding.ticker],
+                self._ticker_query(holding.ticker, holding.name),
+                3
+            ))
 
-        # 2. Scan sectors
+        # 2. Sectors, tagged with the holdings they map to
         for sector in portfolio.get_sectors():
-            news = self._search_sector_news(sector)
-            # Map sector news to affected holdings
-            for item in news:
-                for h in portfolio.get_holdings_by_sector(sector):
-                    if h.ticker not in item.affected_tickers:
-                        item.affected_tickers.append(h.ticker)
-            all_news.extend(news)
+            sector_tickers = [
+                h.ticker for h in portfolio.get_holdings_by_sector(sector)
+            ]
+            searches.append((sector_tickers, self._sector_query(sector), 3))
 
-        # 3. Scan correlated assets
+        # 3. Correlated assets
         correlated = portfolio.get_correlated_tickers()
         for ticker in list(correlated)[:5]:  # Limit to top 5 correlated
-            news = self._search_ticker_news(ticker)
-            all_news.extend(news)
-
-        # Deduplicate by URL
-        seen_urls = set()
-        unique_news = []
-        for item in all_news:
-            if item.url not in seen_urls:
-                seen_urls.add(item.url)
-                unique_news.append(item)
-
-        return unique_news
+            searches.append(([], self._ticker_query(ticker), 3))
+
+        return searches
+
+    async def _gather_searches(
+        self, searches: List[Tuple[List[str], str, int]], depth: str = 'basic'
+    ) -> List[List[NewsItem]]:
+        """Run a search plan concurrently under one shared client."""
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_SEARCHES)
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            return await asyncio.gather(*[
+                self._search_general_async(
+                    client, semaphore, query, max_results, depth=depth
+                )
+                for _, query, max_results in searches
+            ])
 
     def scan_macro_events(self) -> List[NewsItem]:
         """
@@ -121,21 +233,25 @@ class NewsScanner:
             "inflation CPI economic data",
             "geopolitical risk market impact"
         ]
+        searches = [([], query, 3) for query in queries]
 
-        all_news = []
-        for query in queries:
-            news = self._search_general(query, max_results=3)
-            all_news.extend(news)
-
-        # Deduplicate
-        seen_urls = set()
-        unique_news = []
-        for item in all_news:
-            if item.url not in seen_urls:
-                seen_urls.add(item.url)
-                unique_news.append(item)
+        # The macro sweep is few queries but high value; pay for the
+        # deeper Tavily tier there while the per-ticker pass stays basic
+        if HTTPX_AVAILABLE:
+            results = asyncio.run(self._gather_searches(searches, depth='advanced'))
+        else:
+            results = [
+                self._search_general(query, max_results=3, depth='advanced')
+                for query in queries
+            ]
+
+        # Deduplicate by canonical URL and fingerprint as results stream in
+        unique_news: Dict[tuple, NewsItem] = {}
+        for news in results:
+            for item in news:
+                unique_news.setdefault(_dedupe_key(item), item)
 
-        return unique_news
+        return list(unique_news.values())
 
     def scan_risk_factors(self, risk_factors: Set[str]) -> List[NewsItem]:
         """
@@ -147,48 +263,131 @@ class NewsScanner:
         Returns:
             List of relevant news items
         """
-        all_news = []
+        searches = [
+            ([], f"{factor} market news today impact", 2)
+            for factor in risk_factors
+        ]
+
+        if HTTPX_AVAILABLE:
+            results = asyncio.run(self._gather_searches(searches))
+        else:
+            results = [
+                self._search_general(query, max_results=max_results)
+                for _, query, max_results in searches
+            ]
 
-        for factor in risk_factors:
-            query = f"{factor} market news today impact"
-            news = self._search_general(query, max_results=2)
+        all_news = []
+        for news in results:
             for item in news:
                 item.relevance_score = 0.8  # High relevance for risk factors
             all_news.extend(news)
 
         return all_news
 
+    def _ticker_query(self, ticker: str, name: str = "") -> str:
+        """Build the news query for a ticker."""
+        return f"{ticker} {name} stock ETF news today market"
+
+    def _sector_query(self, sector: str) -> str:
+        """Build the news query for a sector."""
+        return _SECTOR_QUERIES.get(sector.lower()) or f"{sector} sector stocks news today"
+
     def _search_ticker_news(self, ticker: str, name: str = "") -> List[NewsItem]:
         """Search news for a specific ticker."""
         if not self.tavily:
             return []
 
-        query = f"{ticker} {name} stock ETF news today market"
-        return self._search_general(query, max_results=3)
+        return self._search_general(self._ticker_query(ticker, name), max_results=3)
 
     def _search_sector_news(self, sector: str) -> List[NewsItem]:
         """Search news for a sector."""
         if not self.tavily:
             return []
 
-        sector_queries = {
-            "precious_metals": "gold silver precious metals market news today",
-            "tech": "technology stocks Nasdaq tech sector news today",
-            "energy": "oil energy sector stocks news today",
-            "financials": "financial banks stocks sector news today",
-            "healthcare": "healthcare pharma biotech stocks news today"
-        }
-
-        query = sector_queries.get(sector.lower(), f"{sector} sector stocks news today")
-        return self._search_general(query, max_results=3)
+        return self._search_general(self._sector_query(sector), max_results=3)
 
-    def _search_general(self, query: str, max_results: int = 5) -> List[NewsItem]:
+    def _search_general(
+        self, query: str, max_results: int = 5, depth: str = 'basic'
+    ) -> List[NewsItem]:
         """Execute a general news search."""
         if not self.tavily:
             return []
 
+        # Shared cache: identical queries across monitor runs and
+        # processes skip the API call entirely
+        cache_key = "tv:" + hashlib.sha1(
+            f"{query}|{max_results}|{depth}".encode()
+        ).hexdigest()
+        cached = _cache.get_json(cache_key)
+        if cached is not None:
+            return [_news_from_dict(d) for d in cached]
+
+        disk_key = ('tavily', query, max_results, depth)
+        cached = _cache.disk_get(disk_key, _SEARCH_DISK_TTL_SECONDS)
+        if cached is not None:
+            return [_news_from_dict(d) for d in cached]
+
+        try:
+            kwargs = {'max_results': max_results, 'search_depth': depth}
+            if os.getenv('PT_TRUSTED_DOMAINS'):
+                kwargs['include_domains'] = list(_TRUSTED_DOMAINS)
+            result = self.tavily.search(query, **kwargs)
+            news = []
+
+            for r in result.get('results', []):
+                news.append(NewsItem(
+                    title=r.get('title', ''),
+                    content=r.get('content', '')[:500],
+                    url=r.get('url', ''),
+                    source='tavily',
+                    relevance_score=r.get('score', 0.5)
+                ))
+
+            records = [n.to_dict() for n in news]
+            _cache.set_json(cache_key, records, _TAVILY_TTL_SECONDS)
+            _cache.disk_set(disk_key, records, _SEARCH_DISK_TTL_SECONDS)
+            return news
+        except Exception as e:
+            print(f"News search error: {e}")
+            return []
+
+    async def _search_general_async(
+        self,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+        query: str,
+        max_results: int = 5,
+        depth: str = 'basic'
+    ) -> List[NewsItem]:
+        """Async counterpart of _search_general, hitting the HTTP API directly."""
+        if not self._api_key:
+            return []
+
+        cache_key = "tv:" + hashlib.sha1(
+            f"{query}|{max_results}|{depth}".encode()
+        ).hexdigest()
+        cached = _cache.get_json(cache_key)
+        if cached is not None:
+            return [_news_from_dict(d) for d in cached]
+
+        disk_key = ('tavily', query, max_results, depth)
+        cached = _cache.disk_get(disk_key, _SEARCH_DISK_TTL_SECONDS)
+        if cached is not None:
+            return [_news_from_dict(d) for d in cached]
+
         try:
-            result = self.tavily.search(query, max_results=max_results)
+            payload = {
+                'api_key': self._api_key,
+                'query': query,
+                'max_results': max_results,
+                'search_depth': depth
+            }
+            if os.getenv('PT_TRUSTED_DOMAINS'):
+                payload['include_domains'] = list(_TRUSTED_DOMAINS)
+            async with semaphore:
+                response = await client.post(_TAVILY_API_URL, json=payload)
+            response.raise_for_status()
+            result = response.json()
             news = []
 
             for r in result.get('results', []):
@@ -200,6 +399,9 @@ class NewsScanner:
                     relevance_score=r.get('score', 0.5)
                 ))
 
+            records = [n.to_dict() for n in news]
+            _cache.set_json(cache_key, records, _TAVILY_TTL_SECONDS)
+            _cache.disk_set(disk_key, records, _SEARCH_DISK_TTL_SECONDS)
             return news
         except Exception as e:
             print(f"News search error: {e}")
@@ -245,19 +447,31 @@ class NewsScanner:
         if not news_items:
             return "No relevant news found."
 
-        lines = []
-        lines.append(f"## Recent News ({len(news_items)} items)")
-        lines.append("")
+        buf = io.StringIO()
+        write = buf.write
+        write(f"## Recent News ({len(news_items)} items)\n\n")
+
+        # Top 10 by relevance via a partial sort; argpartition is O(N)
+        # where a full sort would be O(N log N)
+        if len(news_items) > 10:
+            scores = np.fromiter(
+                (item.relevance_score for item in news_items),
+                dtype=np.float32, count=len(news_items)
+            )
+            top_idx = np.argpartition(-scores, 10)[:10]
+            top_idx = top_idx[np.argsort(-scores[top_idx])]
+            top_items = [news_items[i] for i in top_idx]
+        else:
+            top_items = news_items
 
-        for i, item in enumerate(news_items[:10], 1):  # Limit to 10
+        for i, item in enumerate(top_items, 1):  # Limit to 10
             tickers = ", ".join(item.affected_tickers) if item.affected_tickers else "General"
-            lines.append(f"### {i}. {item.title}")
-            lines.append(f"    Tickers: {tickers}")
-            lines.append(f"    {item.content[:300]}...")
-            lines.append("")
+            write(f"### {i}. {item.title}\n")
+            write(f"    Tickers: {tickers}\n")
+            write(f"    {item.content[:300]}...\n\n")
 
         # Add Perplexity insights if available
         if 'portfolio' in self._perplexity_cache:
-            lines.append("\n" + self._perplexity_cache['portfolio'])
+            write("\n" + self._perplexity_cache['portfolio'] + "\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()[:-1]
@@ -2,42 +2,271 @@
 Perplexity Search Integration for Port-Tracker.
 Provides real-time news and market information using Perplexity API.
 """
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import time
 import requests
 from datetime import datetime
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Any
-from dotenv import load_dotenv
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Decode response bytes directly; orjson's C parser skips the utf-8
+# decode + pure-Python parse that response.json() would do
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+from src.utils import FileCache
+
+logger = logging.getLogger(__name__)
+
+# Retry policy shared by both sync backends: retry transient statuses
+# with exponential backoff, honoring the server's Retry-After on 429s.
+# Other 4xx statuses are permanent (bad request, quota exhausted) and
+# fail immediately rather than burning retries.
+_MAX_RETRIES = 4
+_BACKOFF_FACTOR = 0.5
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Error classes raised by whichever sync backend handled the request
+if HTTPX_AVAILABLE:
+    _HTTP_ERRORS = (httpx.HTTPError, requests.exceptions.RequestException)
+else:
+    _HTTP_ERRORS = (requests.exceptions.RequestException,)
+
+# Response cache: Perplexity bills per request, and the macro/risk
+# queries return near-identical content across short windows
+_RESPONSE_CACHE = FileCache('.cache/perplexity')
+_DEFAULT_TTL_SECONDS = 15 * 60
+_MACRO_TTL_SECONDS = 60 * 60
+
+
+# Prompt templates, built once at import and filled with .format per
+# call. Centralizing them here lets the wording change without touching
+# the query builders.
+_PORTFOLIO_RISKS_PROMPT = """
+        What are the current market risks and news that could negatively impact these investments?
+
+        Holdings: {tickers}
+        Sectors: {sectors}
+
+        Focus on:
+        1. Breaking news that could affect these assets
+        2. Upcoming economic events (Fed, CPI, earnings)
+        3. Technical patterns suggesting potential reversals
+        4. Sector-specific risks
+        5. Macro risks (dollar, rates, geopolitical)
+
+        Provide specific, actionable risk warnings with time horizons.
+        """
+
+_MACRO_RISKS_PROMPT = """
+        What are the top 5 macro-economic risks for US equity and precious metals investors today?
+
+        Consider:
+        - Federal Reserve policy and rate expectations
+        - US Dollar strength/weakness
+        - Inflation data and expectations
+        - Geopolitical tensions
+        - Market sentiment extremes
+
+        For each risk, indicate:
+        - Severity (Critical/High/Medium/Low)
+        - Time horizon (Immediate/Short-term/Medium-term)
+        - Which assets are most affected
+        """
+
+_ASSET_NEWS_PROMPT = """
+        What is the latest news and analysis for {ticker} ({name})?
+
+        Include:
+        - Price action and trend
+        - Recent news affecting the asset
+        - Analyst opinions and price targets
+        - Upcoming catalysts or risks
+        - Technical levels to watch
+        """
+
+_BATCH_NEWS_PROMPT = """
+        For each of the following assets, return a JSON object keyed by ticker
+        where each value has the keys "summary", "catalysts" and "risks".
 
-load_dotenv()
+        Assets: {assets}
+
+        Respond ONLY with JSON.
+        """
+
+_CORRELATION_PROMPT = """
+        Analyze the current correlation between {asset1} and {asset2}.
+
+        - Are they currently diverging from historical correlation?
+        - What could explain any divergence?
+        - Which asset is likely to "catch up" to the other?
+        - What does this divergence signal for investors?
+        """
 
 
-@dataclass
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Backoff delay for a retryable status, honoring Retry-After."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return _BACKOFF_FACTOR * (2 ** attempt)
+
+
+@dataclass(frozen=True, slots=True)
 class PerplexityResult:
     """A search result from Perplexity."""
     content: str
-    citations: List[str]
+    citations: Tuple[str, ...]
     query: str
     timestamp: datetime
+    # Memoized format_for_llm rendering; written via object.__setattr__
+    # because the dataclass is frozen
+    _formatted: Optional[str] = field(default=None, compare=False, repr=False)
+
+    def format_for_llm(self) -> str:
+        """Format the result for an LLM prompt, caching the rendering."""
+        if self._formatted is not None:
+            return self._formatted
+
+        lines = []
+        lines.append("## Real-Time Market Intelligence (via Perplexity)")
+        lines.append(f"Query: {self.query}")
+        lines.append(f"Timestamp: {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("")
+        lines.append(self.content)
+
+        if self.citations:
+            lines.append("")
+            lines.append("### Sources:")
+            for i, cite in enumerate(self.citations[:5], 1):
+                lines.append(f"  {i}. {cite}")
+
+        text = "\n".join(lines)
+        object.__setattr__(self, '_formatted', text)
+        return text
 
 
 class PerplexitySearch:
     """Client for Perplexity API searches."""
 
     def __init__(self, api_key: Optional[str] = None):
+        if api_key is None and 'PERPLEXITY_API_KEY' not in os.environ:
+            # Defer the .env filesystem walk to first construction; most
+            # imports of this module never build a client, and the walk
+            # is skipped entirely when the key is already exported
+            from dotenv import load_dotenv
+            load_dotenv()
         self.api_key = api_key or os.getenv('PERPLEXITY_API_KEY')
         self.base_url = "https://api.perplexity.ai/chat/completions"
 
         if not self.api_key:
-            print("Warning: PERPLEXITY_API_KEY not set. Perplexity search disabled.")
-
-    def search(self, query: str, focus: str = "news") -> Optional[PerplexityResult]:
+            logger.warning("PERPLEXITY_API_KEY not set. Perplexity search disabled.")
+
+        # One pooled connection for all queries: the risk, macro and
+        # per-asset searches hit the same host back-to-back, so keeping
+        # the connection alive skips a TLS handshake per call. httpx is
+        # preferred so multiple queries multiplex as HTTP/2 streams over
+        # a single connection; requests keeps HTTP/1.1 keep-alive when
+        # httpx is not installed.
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self._client = None
+        self._session = None
+        if HTTPX_AVAILABLE:
+            timeout = httpx.Timeout(30.0, connect=5.0)
+            try:
+                self._client = httpx.Client(
+                    http2=True, timeout=timeout, headers=headers
+                )
+            except ImportError:
+                # HTTP/2 needs the optional h2 package; fall back to
+                # HTTP/1.1 keep-alive on the same client
+                self._client = httpx.Client(timeout=timeout, headers=headers)
+        else:
+            self._session = requests.Session()
+            self._session.headers.update(headers)
+            self._session.mount('https://', HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=_MAX_RETRIES,
+                    backoff_factor=_BACKOFF_FACTOR,
+                    status_forcelist=list(_RETRY_STATUSES),
+                    respect_retry_after_header=True,
+                    allowed_methods={"POST"}
+                )
+            ))
+
+    def close(self) -> None:
+        """Release the pooled connections."""
+        if self._client is not None:
+            self._client.close()
+        else:
+            self._session.close()
+
+    def __enter__(self) -> "PerplexitySearch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _post(self, payload: dict):
+        """POST a payload over whichever sync backend is available."""
+        if self._client is None:
+            # The mounted Retry on the requests adapter handles backoff
+            # and Retry-After itself
+            response = self._session.post(
+                self.base_url, json=payload, timeout=(5, 30)
+            )
+            response.raise_for_status()
+            return response
+
+        for attempt in range(_MAX_RETRIES + 1):
+            response = self._client.post(self.base_url, json=payload)
+            if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                response.raise_for_status()
+                return response
+            delay = _retry_delay(response.headers.get('Retry-After'), attempt)
+            logger.warning(
+                "Perplexity returned %d; retrying in %.1fs (attempt %d/%d)",
+                response.status_code, delay, attempt + 1, _MAX_RETRIES
+            )
+            time.sleep(delay)
+
+    def search(
+        self,
+        query: str,
+        focus: str = "news",
+        ttl_seconds: int = _DEFAULT_TTL_SECONDS
+    ) -> Optional[PerplexityResult]:
         """
         Execute a search query using Perplexity.
 
         Args:
             query: Search query
             focus: Search focus - "news" for recent news, "general" for broader search
+            ttl_seconds: How long a cached response for this query stays fresh
 
         Returns:
             PerplexityResult or None if failed
@@ -45,13 +274,33 @@ class PerplexitySearch:
         if not self.api_key:
             return None
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        payload = self._build_payload(query)
+        cache_key = self._cache_key(payload)
+        cached = _RESPONSE_CACHE.get(cache_key, ttl_seconds)
+        if cached is not None:
+            return cached
+
+        try:
+            response = self._post(payload)
+            result = self._result_from_data(_loads(response.content), query)
+            _RESPONSE_CACHE.set(cache_key, result)
+            return result
 
+        except _HTTP_ERRORS:
+            logger.exception("Perplexity search failed")
+            return None
+
+    @staticmethod
+    def _cache_key(payload: dict) -> str:
+        """Stable digest of the full request payload."""
+        return hashlib.md5(
+            json.dumps(payload, sort_keys=True).encode()
+        ).hexdigest()
+
+    def _build_payload(self, query: str) -> dict:
+        """Build the chat-completions payload for a search query."""
         # Use sonar model for search
-        payload = {
+        return {
             "model": "sonar-pro",
             "messages": [
                 {
@@ -67,29 +316,80 @@ class PerplexitySearch:
             "return_citations": True
         }
 
+    def _result_from_data(self, data: dict, query: str) -> PerplexityResult:
+        """Build a PerplexityResult from a decoded API response."""
+        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
+        # Dedupe in one order-preserving pass and freeze; the API often
+        # repeats the same URL across answer chunks
+        citations = tuple(dict.fromkeys(data.get('citations', [])))
+
+        return PerplexityResult(
+            content=content,
+            citations=citations,
+            query=query,
+            timestamp=datetime.now()
+        )
+
+    async def _asearch(
+        self,
+        client,
+        query: str,
+        ttl_seconds: int = _DEFAULT_TTL_SECONDS
+    ) -> Optional[PerplexityResult]:
+        """Async counterpart of search, sharing one httpx client."""
+        payload = self._build_payload(query)
+        cache_key = self._cache_key(payload)
+        cached = _RESPONSE_CACHE.get(cache_key, ttl_seconds)
+        if cached is not None:
+            return cached
+
         try:
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            response = await client.post(self.base_url, json=payload)
             response.raise_for_status()
-            data = response.json()
-
-            content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
-            citations = data.get('citations', [])
+            result = self._result_from_data(_loads(response.content), query)
+            _RESPONSE_CACHE.set(cache_key, result)
+            return result
+        except Exception:
+            logger.exception("Perplexity search failed")
+            return None
 
-            return PerplexityResult(
-                content=content,
-                citations=citations,
-                query=query,
-                timestamp=datetime.now()
-            )
+    async def asearch_all(self, portfolio) -> List[Optional[PerplexityResult]]:
+        """
+        Run the portfolio-risk, macro-risk and per-asset searches
+        concurrently.
 
-        except requests.exceptions.RequestException as e:
-            print(f"Perplexity search error: {e}")
-            return None
+        Returns results in order: portfolio risks, macro risks, then one
+        per holding. Each slot is None on failure, matching the sync
+        helpers.
+        """
+        if not self.api_key or not HTTPX_AVAILABLE:
+            return []
+
+        queries = [
+            self._portfolio_risks_query(
+                portfolio.get_tickers(), list(portfolio.get_sectors())
+            ),
+            self._macro_risks_query()
+        ]
+        queries.extend(
+            self._asset_news_query(h.ticker, h.name) for h in portfolio.holdings
+        )
+
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        ) as client:
+            return await asyncio.gather(*[
+                self._asearch(client, query) for query in queries
+            ])
+
+    def search_all(self, portfolio) -> List[Optional[PerplexityResult]]:
+        """Sync wrapper around asearch_all."""
+        return asyncio.run(self.asearch_all(portfolio))
 
     def search_portfolio_risks(self, tickers: List[str], sectors: List[str]) -> Optional[PerplexityResult]:
         """
@@ -102,91 +402,111 @@ class PerplexitySearch:
         Returns:
             PerplexityResult with risk analysis
         """
-        ticker_str = ", ".join(tickers[:5])  # Limit to 5 tickers
-        sector_str = ", ".join(sectors)
+        return self.search(self._portfolio_risks_query(tickers, sectors))
 
-        query = f"""
-        What are the current market risks and news that could negatively impact these investments?
+    def _portfolio_risks_query(self, tickers: List[str], sectors: List[str]) -> str:
+        """Build the portfolio risk query."""
+        return _PORTFOLIO_RISKS_PROMPT.format(
+            tickers=", ".join(tickers[:5]),  # Limit to 5 tickers
+            sectors=", ".join(sectors)
+        )
 
-        Holdings: {ticker_str}
-        Sectors: {sector_str}
+    def search_macro_risks(self) -> Optional[PerplexityResult]:
+        """Search for current macro-economic risks."""
+        # Macro risks drift slowly; worth the longer cache window
+        return self.search(self._macro_risks_query(), ttl_seconds=_MACRO_TTL_SECONDS)
 
-        Focus on:
-        1. Breaking news that could affect these assets
-        2. Upcoming economic events (Fed, CPI, earnings)
-        3. Technical patterns suggesting potential reversals
-        4. Sector-specific risks
-        5. Macro risks (dollar, rates, geopolitical)
+    def _macro_risks_query(self) -> str:
+        """Build the macro risk query."""
+        return _MACRO_RISKS_PROMPT
 
-        Provide specific, actionable risk warnings with time horizons.
-        """
+    def search_asset_news(self, ticker: str, asset_name: str) -> Optional[PerplexityResult]:
+        """Search for news about a specific asset."""
+        return self.search_assets_news([(ticker, asset_name)]).get(ticker)
 
-        return self.search(query)
+    def search_assets_news(
+        self, assets: List[Tuple[str, str]]
+    ) -> Dict[str, PerplexityResult]:
+        """
+        Search news for many assets in a single request.
 
-    def search_macro_risks(self) -> Optional[PerplexityResult]:
-        """Search for current macro-economic risks."""
-        query = """
-        What are the top 5 macro-economic risks for US equity and precious metals investors today?
+        One multi-ticker prompt asking for structured JSON replaces a
+        round-trip per holding.
 
-        Consider:
-        - Federal Reserve policy and rate expectations
-        - US Dollar strength/weakness
-        - Inflation data and expectations
-        - Geopolitical tensions
-        - Market sentiment extremes
+        Args:
+            assets: (ticker, name) pairs
 
-        For each risk, indicate:
-        - Severity (Critical/High/Medium/Low)
-        - Time horizon (Immediate/Short-term/Medium-term)
-        - Which assets are most affected
+        Returns:
+            Mapping of ticker to PerplexityResult; empty on failure
         """
+        if not self.api_key or not assets:
+            return {}
 
-        return self.search(query)
+        query = _BATCH_NEWS_PROMPT.format(
+            assets=", ".join(f"{ticker} ({name})" for ticker, name in assets)
+        )
 
-    def search_asset_news(self, ticker: str, asset_name: str) -> Optional[PerplexityResult]:
-        """Search for news about a specific asset."""
-        query = f"""
-        What is the latest news and analysis for {ticker} ({asset_name})?
+        payload = self._build_payload(query)
+        payload["response_format"] = {"type": "json_object"}
+        cache_key = self._cache_key(payload)
+        cached = _RESPONSE_CACHE.get(cache_key, _DEFAULT_TTL_SECONDS)
+        if cached is not None:
+            return cached
 
-        Include:
-        - Price action and trend
-        - Recent news affecting the asset
-        - Analyst opinions and price targets
-        - Upcoming catalysts or risks
-        - Technical levels to watch
-        """
+        try:
+            response = self._post(payload)
+            data = _loads(response.content)
+        except _HTTP_ERRORS:
+            logger.exception("Perplexity search failed")
+            return {}
+
+        content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
+        citations = tuple(dict.fromkeys(data.get('citations', [])))
+        try:
+            sections = json.loads(content)
+        except ValueError:
+            logger.exception("Perplexity batch response was not valid JSON")
+            return {}
+        if not isinstance(sections, dict):
+            # Valid JSON but not the requested object (e.g. a top-level
+            # array or string); treat like any other malformed response
+            logger.warning(
+                "Perplexity batch response was not a JSON object: %s",
+                type(sections).__name__
+            )
+            return {}
+
+        now = datetime.now()
+        results = {}
+        for ticker, _ in assets:
+            section = sections.get(ticker)
+            if section is None:
+                continue
+            if isinstance(section, dict):
+                text = "\n".join(f"{k.capitalize()}: {v}" for k, v in section.items())
+            else:
+                text = str(section)
+            results[ticker] = PerplexityResult(
+                content=text,
+                citations=citations,
+                query=query,
+                timestamp=now
+            )
+
+        _RESPONSE_CACHE.set(cache_key, results)
+        return results
 
-        return self.search(query)
+    def _asset_news_query(self, ticker: str, asset_name: str) -> str:
+        """Build the single-asset news query."""
+        return _ASSET_NEWS_PROMPT.format(ticker=ticker, name=asset_name)
 
     def search_correlation_risks(self, asset1: str, asset2: str) -> Optional[PerplexityResult]:
         """Search for correlation analysis between two assets."""
-        query = f"""
-        Analyze the current correlation between {asset1} and {asset2}.
-
-        - Are they currently diverging from historical correlation?
-        - What could explain any divergence?
-        - Which asset is likely to "catch up" to the other?
-        - What does this divergence signal for investors?
-        """
+        return self.search(_CORRELATION_PROMPT.format(asset1=asset1, asset2=asset2))
 
-        return self.search(query)
-
-    def format_for_llm(self, result: PerplexityResult) -> str:
+    def format_for_llm(self, result: Optional[PerplexityResult]) -> str:
         """Format Perplexity result for LLM prompt."""
         if not result:
             return "No Perplexity search results available."
 
-        lines = []
-        lines.append("## Real-Time Market Intelligence (via Perplexity)")
-        lines.append(f"Query: {result.query}")
-        lines.append(f"Timestamp: {result.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("")
-        lines.append(result.content)
-
-        if result.citations:
-            lines.append("")
-            lines.append("### Sources:")
-            for i, cite in enumerate(result.citations[:5], 1):
-                lines.append(f"  {i}. {cite}")
-
-        return "\n".join(lines)
+        return result.format_for_llm()
@@ -2,13 +2,32 @@
 Portfolio Holdings Management for Port-Tracker.
 Defines holdings, portfolios, and loading from JSON configuration.
 """
+import io
 import json
+import sys
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Set
 from pathlib import Path
 
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# C-level JSON codec when orjson is installed; both sides produce and
+# consume bytes so the call sites stay identical
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+    _dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj, indent=2).encode()
+
+
+@dataclass(slots=True)
 class Holding:
     """A single holding in the portfolio."""
     ticker: str
@@ -21,8 +40,19 @@ class Holding:
     avg_price: Optional[float] = None
 
     def __post_init__(self):
+        # Canonicalize once at construction so lookups and comparisons
+        # never re-case per call. sector and asset_type come from a tiny
+        # fixed vocabulary, so interning makes every holding share one
+        # str object and turns equality checks into pointer comparisons.
         self.ticker = self.ticker.upper()
-        self.correlated_assets = [t.upper() for t in self.correlated_assets]
+        self.sector = sys.intern(self.sector.lower())
+        self.asset_type = sys.intern(self.asset_type.lower())
+        # User-authored lists often repeat entries; one dict.fromkeys
+        # pass dedupes while keeping first-seen order
+        self.correlated_assets = list(
+            dict.fromkeys(t.upper() for t in self.correlated_assets)
+        )
+        self.risk_factors = list(dict.fromkeys(self.risk_factors))
 
     def to_dict(self) -> dict:
         result = {
@@ -40,70 +70,123 @@ class Holding:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class Portfolio:
     """User's portfolio of holdings."""
     holdings: List[Holding]
     name: str = "My Portfolio"
 
+    # Cached views assigned in __post_init__; declared so they land in
+    # the class slots. compare=False keeps __eq__ on (holdings, name)
+    # only - ndarray comparisons would not reduce to a bool anyway.
+    _ticker_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    _sector_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    _qty_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    _px_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    _tickers: List[str] = field(init=False, repr=False, compare=False)
+    _ticker_set: Set[str] = field(init=False, repr=False, compare=False)
+    _sectors: Set[str] = field(init=False, repr=False, compare=False)
+    _watch: Set[str] = field(init=False, repr=False, compare=False)
+    _correlated: Set[str] = field(init=False, repr=False, compare=False)
+    _risk_factors: Set[str] = field(init=False, repr=False, compare=False)
+    _by_ticker: Dict[str, Holding] = field(init=False, repr=False, compare=False)
+    _by_sector: Dict[str, List[Holding]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Structure-of-arrays view of the holdings for vectorized analysis.
+        # The dataclass list stays the source of truth; these parallel
+        # columns let analyzers avoid per-holding attribute access.
+        n = len(self.holdings)
+        self._ticker_arr = np.array([h.ticker for h in self.holdings], dtype=object)
+        self._sector_arr = np.array([h.sector for h in self.holdings], dtype=object)
+        self._qty_arr = np.fromiter(
+            (h.quantity if h.quantity is not None else np.nan for h in self.holdings),
+            dtype=np.float64, count=n
+        )
+        self._px_arr = np.fromiter(
+            (h.avg_price if h.avg_price is not None else np.nan for h in self.holdings),
+            dtype=np.float64, count=n
+        )
+
+        # Derived views the monitors hit repeatedly, built in a single
+        # pass over the holdings since they are fixed after construction.
+        # Callers treat these as read-only; call invalidate() after
+        # mutating holdings.
+        tickers: List[str] = []
+        held: Set[str] = set()
+        sectors: Set[str] = set()
+        correlated: Set[str] = set()
+        risk_factors: Set[str] = set()
+        by_ticker: Dict[str, Holding] = {}
+        by_sector: Dict[str, List[Holding]] = {}
+        for h in self.holdings:
+            tickers.append(h.ticker)
+            held.add(h.ticker)
+            sectors.add(h.sector)
+            correlated.update(h.correlated_assets)
+            risk_factors.update(h.risk_factors)
+            by_ticker[h.ticker] = h
+            by_sector.setdefault(h.sector, []).append(h)
+        self._tickers = tickers
+        self._ticker_set = held
+        self._sectors = sectors
+        self._watch = held | correlated
+        self._correlated = correlated - held
+        self._risk_factors = risk_factors
+        self._by_ticker = by_ticker
+        self._by_sector = by_sector
+
+    def invalidate(self) -> None:
+        """Rebuild the cached views after mutating holdings."""
+        self.__post_init__()
+
     def get_tickers(self) -> List[str]:
         """Get all ticker symbols in the portfolio."""
-        return [h.ticker for h in self.holdings]
+        return self._tickers
 
     def get_sectors(self) -> Set[str]:
         """Get unique sectors represented in the portfolio."""
-        return {h.sector for h in self.holdings}
+        return self._sectors
 
     def get_correlated_tickers(self) -> Set[str]:
         """Get all correlated tickers to monitor (excluding held tickers)."""
-        held = set(self.get_tickers())
-        correlated = set()
-        for h in self.holdings:
-            correlated.update(h.correlated_assets)
-        return correlated - held
+        return self._correlated
 
     def get_all_watch_tickers(self) -> Set[str]:
         """Get all tickers to watch (held + correlated)."""
-        tickers = set(self.get_tickers())
-        for h in self.holdings:
-            tickers.update(h.correlated_assets)
-        return tickers
+        return self._watch
 
     def get_all_risk_factors(self) -> Set[str]:
         """Get all risk factors across holdings."""
-        factors = set()
-        for h in self.holdings:
-            factors.update(h.risk_factors)
-        return factors
+        return self._risk_factors
 
     def get_holdings_by_sector(self, sector: str) -> List[Holding]:
         """Get all holdings in a specific sector."""
-        return [h for h in self.holdings if h.sector.lower() == sector.lower()]
+        return self._by_sector.get(sector.lower(), [])
 
     def get_holding(self, ticker: str) -> Optional[Holding]:
         """Get a specific holding by ticker."""
-        ticker = ticker.upper()
-        for h in self.holdings:
-            if h.ticker == ticker:
-                return h
-        return None
+        return self._by_ticker.get(ticker.upper())
 
     def format_for_llm(self) -> str:
         """Format portfolio summary for LLM prompt."""
-        lines = []
-        lines.append(f"Portfolio: {self.name}")
-        lines.append(f"Total Holdings: {len(self.holdings)}")
-        lines.append(f"Sectors: {', '.join(self.get_sectors())}")
-        lines.append("")
+        buf = io.StringIO()
+        write = buf.write
+        write(
+            f"Portfolio: {self.name}\n"
+            f"Total Holdings: {len(self.holdings)}\n"
+            f"Sectors: {', '.join(self.get_sectors())}\n\n"
+        )
 
         for h in self.holdings:
-            lines.append(f"### {h.ticker} - {h.name}")
-            lines.append(f"    Type: {h.asset_type} | Sector: {h.sector}")
-            lines.append(f"    Correlated: {', '.join(h.correlated_assets) if h.correlated_assets else 'None'}")
-            lines.append(f"    Risk Factors: {', '.join(h.risk_factors) if h.risk_factors else 'None'}")
-            lines.append("")
+            write(
+                f"### {h.ticker} - {h.name}\n"
+                f"    Type: {h.asset_type} | Sector: {h.sector}\n"
+                f"    Correlated: {', '.join(h.correlated_assets) or 'None'}\n"
+                f"    Risk Factors: {', '.join(h.risk_factors) or 'None'}\n\n"
+            )
 
-        return "\n".join(lines)
+        return buf.getvalue()[:-1]
 
     def to_dict(self) -> dict:
         return {
@@ -126,8 +209,7 @@ def load_portfolio(filepath: str = "data/portfolio.json") -> Portfolio:
     if not path.exists():
         raise FileNotFoundError(f"Portfolio file not found: {filepath}")
 
-    with open(path, 'r') as f:
-        data = json.load(f)
+    data = _loads(path.read_bytes())
 
     holdings = []
     for h in data.get("holdings", []):
@@ -153,39 +235,41 @@ def save_portfolio(portfolio: Portfolio, filepath: str = "data/portfolio.json")
     path = Path(filepath)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(path, 'w') as f:
-        json.dump(portfolio.to_dict(), f, indent=2)
+    path.write_bytes(_dumps(portfolio.to_dict()))
 
 
-# Predefined sector correlations for common assets
+# Predefined sector correlations for common assets. Ticker groups are
+# frozensets for O(1) membership tests; risk factors stay ordered tuples.
 SECTOR_CORRELATIONS = {
     "precious_metals": {
-        "positive": ["GLD", "SLV", "GOLD", "NEM", "PAAS"],
-        "negative": ["DXY", "UUP"],  # Dollar strength is negative for metals
-        "risk_factors": ["fed policy", "dollar strength", "inflation", "real rates", "geopolitical"]
+        "positive": frozenset({"GLD", "SLV", "GOLD", "NEM", "PAAS"}),
+        "negative": frozenset({"DXY", "UUP"}),  # Dollar strength is negative for metals
+        "risk_factors": ("fed policy", "dollar strength", "inflation", "real rates", "geopolitical")
     },
     "tech": {
-        "positive": ["QQQ", "SPY", "AAPL", "MSFT", "NVDA", "META", "GOOGL"],
-        "negative": ["TLT"],  # Rising rates (falling bonds) pressure growth
-        "risk_factors": ["rate hikes", "earnings", "AI sentiment", "growth stocks", "antitrust"]
+        "positive": frozenset({"QQQ", "SPY", "AAPL", "MSFT", "NVDA", "META", "GOOGL"}),
+        "negative": frozenset({"TLT"}),  # Rising rates (falling bonds) pressure growth
+        "risk_factors": ("rate hikes", "earnings", "AI sentiment", "growth stocks", "antitrust")
     },
     "energy": {
-        "positive": ["XLE", "XOP", "USO", "CVX", "XOM"],
-        "negative": [],
-        "risk_factors": ["oil prices", "OPEC", "geopolitical", "green energy", "demand"]
+        "positive": frozenset({"XLE", "XOP", "USO", "CVX", "XOM"}),
+        "negative": frozenset(),
+        "risk_factors": ("oil prices", "OPEC", "geopolitical", "green energy", "demand")
     },
     "financials": {
-        "positive": ["XLF", "JPM", "BAC", "GS"],
-        "negative": [],
-        "risk_factors": ["interest rates", "yield curve", "credit risk", "regulation"]
+        "positive": frozenset({"XLF", "JPM", "BAC", "GS"}),
+        "negative": frozenset(),
+        "risk_factors": ("interest rates", "yield curve", "credit risk", "regulation")
     }
 }
 
+_EMPTY_SECTOR_INFO = {
+    "positive": frozenset(),
+    "negative": frozenset(),
+    "risk_factors": ()
+}
+
 
 def get_sector_info(sector: str) -> Dict:
     """Get correlation and risk info for a sector."""
-    return SECTOR_CORRELATIONS.get(sector.lower(), {
-        "positive": [],
-        "negative": [],
-        "risk_factors": []
-    })
+    return SECTOR_CORRELATIONS.get(sector.lower(), _EMPTY_SECTOR_INFO)
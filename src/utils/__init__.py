@@ -0,0 +1 @@
+from .file_cache import FileCache
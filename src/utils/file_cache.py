@@ -0,0 +1,64 @@
+"""
+File-backed TTL cache for Port-Tracker.
+Persists expensive fetch results (market data, search responses) across runs.
+"""
+import hashlib
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+class FileCache:
+    """
+    Pickle-backed cache keyed by arbitrary key components, with per-read TTL.
+
+    Entries live as individual files under the cache directory, named by
+    the MD5 of their key, so concurrent readers/writers of different keys
+    never contend.
+
+    Example usage:
+        cache = FileCache('.cache/history')
+        hist = cache.get(('SLV', '30d'), ttl_seconds=900)
+        if hist is None:
+            hist = yf.Ticker('SLV').history(period='30d')
+            cache.set(('SLV', '30d'), hist)
+    """
+
+    def __init__(self, cache_dir: str = ".cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: Any) -> Path:
+        digest = hashlib.md5(repr(key).encode()).hexdigest()
+        return self.cache_dir / f"{digest}.pkl"
+
+    def get(self, key: Any, ttl_seconds: float) -> Optional[Any]:
+        """Get a cached value, or None if missing, expired, or unreadable."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > ttl_seconds:
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store a value; atomic so readers never see partial writes."""
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        except OSError:
+            pass  # Caching is best-effort; never fail the caller
+
+    def clear(self) -> None:
+        """Delete all cache entries."""
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                path.unlink()
+            except OSError:
+                pass